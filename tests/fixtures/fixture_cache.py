@@ -0,0 +1,17 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def locmem_cache():
+    with override_settings(CACHES=settings.TEST_CACHES):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(locmem_cache):
+    # Тест откатывает транзакцию, колбэки on_commit сигналов не срабатывают,
+    # так что страницы прошлого теста из кеша никто не сбросит.
+    cache.clear()
@@ -0,0 +1,8 @@
+import pytest
+
+from posts.tests.query_budget import QueryBudget
+
+
+@pytest.fixture
+def query_budget(db, client):
+    return QueryBudget(client)
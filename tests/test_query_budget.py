@@ -0,0 +1,14 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestQueryBudget:
+
+    def test_routes_stay_within_budget(self, query_budget):
+        results = query_budget.run()
+        problems = query_budget.violations(results)
+        assert not problems, (
+            'Число SQL-запросов превышает бюджет или растёт вместе с данными:\n'
+            + '\n'.join(problems)
+        )
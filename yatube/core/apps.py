@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_cache_tables(**kwargs):
+    """Таблица SharedDatabaseCache создаётся вместе с migrate.
+
+    Без неё каждый запрос падал бы на общем уровне кеша. post_migrate
+    приходит от каждого приложения, createcachetable уже созданные
+    таблицы молча пропускает.
+    """
+    from django.core.management import call_command
+
+    call_command('createcachetable', database='cache', verbosity=0)
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        post_migrate.connect(create_cache_tables,
+                             dispatch_uid='core.create_cache_tables')
@@ -0,0 +1,31 @@
+from django.db.backends.sqlite3 import base
+
+
+# Прагмы применяются к каждому новому соединению. Переопределяются
+# ключом PRAGMAS в настройках базы.
+DEFAULT_PRAGMAS = {
+    # читатели не ждут писателей из post_create/post_edit
+    'journal_mode': 'WAL',
+    # в режиме WAL fsync только на чекпоинте, база остаётся целой
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # отрицательное значение - размер в КиБ, а не в страницах
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """sqlite3 Django с прагмами для продакшена.
+
+    Постоянные соединения включаются обычным CONN_MAX_AGE: прагмы
+    выставляются один раз на соединение, а не на каждый запрос.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = {**DEFAULT_PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
@@ -0,0 +1,319 @@
+"""Двухуровневый кеш: LRU в памяти процесса перед общим бэкендом.
+
+Общий уровень - кеш из CACHES, который видят все процессы и у которого
+add и incr атомарны: SharedDatabaseCache ниже, memcached или redis.
+На них держатся блокировки пересчёта, счётчики постов и буфер
+просмотров. Локальный уровень - LocMemCache процесса с коротким
+временем жизни; в него попадают только ключи с префиксами из
+LOCAL_KEY_PREFIXES. Это должны быть ключи, значение которых под одним
+именем не меняется (версия уже в ключе, как у страниц и фрагментов):
+изменения в других процессах локальный уровень увидит только через
+LOCAL_TIMEOUT. Счётчики, блокировки и токены версий всегда читаются из
+общего уровня.
+
+get_or_compute защищает дорогие значения от лавины пересчётов:
+пересчитывает один процесс (блокировка add в общем кеше), остальные
+ждут его результата или отдают старое значение, а пересчёт начинается
+заранее, с вероятностью, растущей к концу срока жизни (XFetch).
+"""
+import base64
+import math
+import pickle
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections, router, transaction
+
+
+MISSING = object()
+
+# Метрики общие для всех потоков процесса: django.core.cache создаёт
+# свой экземпляр бэкенда на каждый поток.
+_stats = {}
+_locks = {}
+
+
+class TwoTierCache(BaseCache):
+    """Бэкенд CACHES: локальный LRU процесса перед общим кешем SHARED.
+
+    OPTIONS:
+        SHARED - алиас общего кеша в CACHES;
+        LOCAL_KEY_PREFIXES - ключи, которые можно держать в процессе;
+        LOCAL_MAX_ENTRIES, LOCAL_TIMEOUT - размер и срок локального LRU;
+        LOCK_TIMEOUT - срок блокировки пересчёта, LOCK_WAIT - сколько
+        ждать чужого пересчёта;
+        BETA - агрессивность раннего пересчёта, 0 - выключен.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.name = name
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_prefixes = tuple(options.get('LOCAL_KEY_PREFIXES', ()))
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self.lock_wait = options.get('LOCK_WAIT', 2)
+        self.beta = options.get('BETA', 1.0)
+        self.local = LocMemCache(f'two-tier:{name}', {
+            'TIMEOUT': options.get('LOCAL_TIMEOUT', 5),
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+            },
+        })
+        self._stats = _stats.setdefault(name, Counter())
+        self._lock = _locks.setdefault(name, Lock())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _is_local(self, key):
+        return bool(self.local_prefixes) and key.startswith(
+            self.local_prefixes)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def stats(self):
+        """Попадания, промахи и пересчёты процесса с его запуска."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _local_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.local.default_timeout
+        return max(0, min(timeout - time.time(), self.local.default_timeout))
+
+    def get(self, key, default=None, version=None):
+        if self._is_local(key):
+            value = self.local.get(key, MISSING, version)
+            if value is not MISSING:
+                self._count('local_hits')
+                self._count('hits')
+                return value
+        value = self.shared.get(key, MISSING, version)
+        if value is MISSING:
+            self._count('misses')
+            return default
+        self._count('hits')
+        if self._is_local(key):
+            self.local.set(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        if self.local_prefixes:
+            local_keys = [key for key in keys if self._is_local(key)]
+            found = self.local.get_many(local_keys, version)
+        rest = [key for key in keys if key not in found]
+        shared = self.shared.get_many(rest, version) if rest else {}
+        for key, value in shared.items():
+            if self._is_local(key):
+                self.local.set(key, value, version=version)
+        self._count('local_hits', len(found))
+        self._count('hits', len(found) + len(shared))
+        self._count('misses', len(rest) - len(shared))
+        found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        if self._is_local(key):
+            self.local.set(key, value, self._local_timeout(timeout), version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        self.local.delete_many(list(data), version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self.local.delete(key, version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        self.local.delete(key, version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def has_key(self, key, version=None):
+        return (self._is_local(key) and self.local.has_key(key, version)
+                or self.shared.has_key(key, version))
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version)
+        self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.local.delete_many(keys, version)
+        self.shared.delete_many(keys, version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def _fresh(self, expiry, delta):
+        """XFetch: чем ближе expiry и дороже пересчёт, тем чаще False."""
+        if expiry is None or not self.beta:
+            return True
+        early = -delta * self.beta * math.log(1 - random.random())
+        return time.time() + early < expiry
+
+    def _compute(self, key, compute, timeout, version):
+        start = time.perf_counter()
+        value = compute()
+        delta = time.perf_counter() - start
+        self._count('recomputes')
+        if value is not None:
+            expiry = self.get_backend_timeout(timeout)
+            self.set(key, (value, delta, expiry), timeout, version)
+        return value
+
+    def get_or_compute(self, key, compute, timeout=DEFAULT_TIMEOUT,
+                       version=None):
+        """Значение key или результат compute(), посчитанный одним
+        процессом из всех, кому оно нужно одновременно.
+
+        compute() может вернуть None - тогда значение не кешируется.
+        """
+        entry = self.get(key, version=version)
+        if entry is not None:
+            value, delta, expiry = entry
+            if self._fresh(expiry, delta):
+                return value
+            self._count('early_recomputes')
+
+        lock_key = f'{key}:lock'
+        if self.add(lock_key, 1, self.lock_timeout, version):
+            try:
+                return self._compute(key, compute, timeout, version)
+            finally:
+                self.delete(lock_key, version)
+
+        # Пересчитывает другой процесс: пока можно - отдаём старое.
+        if entry is not None:
+            return entry[0]
+        self._count('lock_waits')
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.shared.get(key, None, version)
+            if entry is not None:
+                return entry[0]
+        return self._compute(key, compute, timeout, version)
+
+
+class SharedDatabaseCache(DatabaseCache):
+    """DatabaseCache с атомарными add, set и incr.
+
+    Стандартный бэкенд читает ключ и пишет его в разных шагах: на SQLite
+    параллельный писатель либо молча теряет запись, либо читает старое
+    значение для incr. Здесь каждая запись сначала берёт блокировку
+    записи пустым UPDATE, так что запись ключа из разных процессов идёт
+    по очереди.
+
+    incr сохраняет срок ключа. Ключи без срока (буфер просмотров, токены
+    версий) при переполнении не вытесняются: их потеря - потеря данных,
+    а не кеша.
+    """
+
+    def _lock_key(self, db, key):
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE %s SET %s = %s WHERE %s = %%s' % (
+                    quote_name(self._table),
+                    quote_name('expires'),
+                    quote_name('expires'),
+                    quote_name('cache_key'),
+                ),
+                [key])
+
+    def _base_set(self, mode, key, value, timeout=DEFAULT_TIMEOUT):
+        db = router.db_for_write(self.cache_model_class)
+        with transaction.atomic(using=db):
+            self._lock_key(db, key)
+            return super()._base_set(mode, key, value, timeout)
+
+    def incr(self, key, delta=1, version=None):
+        """incr без смены срока ключа, как у memcached и LocMemCache:
+        BaseCache.incr пересохранил бы значение со сроком по умолчанию."""
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        cache_key = self.make_key(key, version=version)
+        with transaction.atomic(using=db):
+            self._lock_key(db, cache_key)
+            value = self.get(key, MISSING, version)
+            if value is MISSING:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            pickled = pickle.dumps(value, self.pickle_protocol)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'UPDATE %s SET %s = %%s WHERE %s = %%s' % (
+                        quote_name(self._table),
+                        quote_name('value'),
+                        quote_name('cache_key'),
+                    ),
+                    [base64.b64encode(pickled).decode('latin1'), cache_key])
+        return value
+
+    def _cull(self, db, cursor, now):
+        connection = connections[db]
+        table = connection.ops.quote_name(self._table)
+        forever = connection.ops.adapt_datetimefield_value(
+            datetime.max.replace(microsecond=0))
+        cursor.execute('DELETE FROM %s WHERE expires < %%s' % table,
+                       [connection.ops.adapt_datetimefield_value(now)])
+        cursor.execute('SELECT COUNT(*) FROM %s WHERE expires < %%s' % table,
+                       [forever])
+        num = cursor.fetchone()[0]
+        if num > self._max_entries and self._cull_frequency:
+            # Первыми уходят ключи, которым и так скоро истекать.
+            cursor.execute(
+                'DELETE FROM %s WHERE cache_key IN ('
+                'SELECT cache_key FROM %s WHERE expires < %%s '
+                'ORDER BY expires LIMIT %%s)' % (table, table),
+                [forever, num // self._cull_frequency])
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, alias='default'):
+    """get_or_compute двухуровневого кеша, с любым другим - get и set."""
+    cache = caches[alias]
+    if isinstance(cache, TwoTierCache):
+        return cache.get_or_compute(key, compute, timeout)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, timeout)
+    return value
+
+
+def cache_stats(alias='default'):
+    """Метрики двухуровневого кеша alias, для других кешей - пусто."""
+    cache = caches[alias]
+    return cache.stats() if isinstance(cache, TwoTierCache) else {}
@@ -0,0 +1,136 @@
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+
+N_PLUS_ONE_THRESHOLD = 3
+
+QueryRecord = namedtuple(
+    'QueryRecord', 'sql params fingerprint duration origin')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'IN \((?:\s*(?:\?|%s)\s*,?)+\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Приводит SQL к шаблону без литералов для поиска повторов."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def template_origin():
+    """Шаблон и строка, рендер которых вызвал запрос, либо None."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if (frame.f_code.co_name == 'render_annotated'
+                and isinstance(node, Node) and node.token is not None):
+            return f'{node.origin.template_name}:{node.token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+def origins_enabled():
+    """Искать ли шаблон каждого запроса: обход стека на каждом SQL
+    дорог, поэтому только в DEBUG или с QUERY_STATS_ORIGINS. Иначе
+    шаблон ищется только у повторов, дошедших до порога N+1."""
+    return settings.DEBUG or getattr(settings, 'QUERY_STATS_ORIGINS', False)
+
+
+class QueryRecorder:
+    """execute_wrapper, записывающий каждый SQL-запрос с его временем.
+
+    С origins место вызова ищется у каждого запроса, без него - только
+    у повторов начиная с threshold-го: n_plus_one() находит те же N+1,
+    а одиночные запросы стек не обходят.
+    """
+
+    def __init__(self, threshold=N_PLUS_ONE_THRESHOLD, origins=False):
+        self.threshold = threshold
+        self.origins = origins
+        self.queries = []
+        self.counts = Counter()
+
+    def _origin(self, sql_fingerprint):
+        self.counts[sql_fingerprint] += 1
+        if self.origins or self.counts[sql_fingerprint] >= self.threshold:
+            return template_origin()
+        return None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            sql_fingerprint = fingerprint(sql)
+            self.queries.append(QueryRecord(
+                sql,
+                params,
+                sql_fingerprint,
+                duration,
+                self._origin(sql_fingerprint),
+            ))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self):
+        """Отпечатки запросов, выполненных больше одного раза."""
+        return {sql: times for sql, times in self.counts.items()
+                if times > 1}
+
+    def n_plus_one(self):
+        """Повторы из рендера шаблона: вероятные N+1 с местом вызова."""
+        found = {}
+        for sql, times in self.repeated().items():
+            if times < self.threshold:
+                continue
+            origins = [query.origin for query in self.queries
+                       if query.fingerprint == sql and query.origin]
+            if origins:
+                found[sql] = {
+                    'count': times,
+                    'origin': Counter(origins).most_common(1)[0][0],
+                }
+        return found
+
+    def report(self, view=None):
+        return {
+            'view': view,
+            'queries': self.count,
+            'sql_time_ms': round(self.total_time * 1000, 3),
+            'repeated': self.repeated(),
+            'n_plus_one': self.n_plus_one(),
+        }
+
+
+@contextmanager
+def record_queries(threshold=N_PLUS_ONE_THRESHOLD, origins=None):
+    """Подключает QueryRecorder ко всем соединениям на время блока.
+
+    origins=None - по настройкам, см. origins_enabled().
+    """
+    if origins is None:
+        origins = origins_enabled()
+    recorder = QueryRecorder(threshold, origins)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(
+                connections[alias].execute_wrapper(recorder))
+        yield recorder
@@ -0,0 +1,66 @@
+import json
+import logging
+
+from django.conf import settings
+
+from core.cache import cache_stats
+from core.instrumentation import N_PLUS_ONE_THRESHOLD, record_queries
+
+
+logger = logging.getLogger('yatube.queries')
+
+
+class QueryStatsMiddleware:
+    """Считает SQL-запросы каждого view и ищет в них N+1.
+
+    Заодно прикладывает метрики двухуровневого кеша за запрос: счётчики
+    общие на процесс, поэтому при параллельных запросах это оценка.
+
+    В режиме DEBUG итог уходит в заголовки ответа X-Query-*,
+    иначе - в структурированный лог yatube.queries. Место в шаблоне
+    ищется у каждого запроса только в DEBUG или с QUERY_STATS_ORIGINS,
+    иначе - у повторов, дошедших до порога N+1.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(
+            settings, 'QUERY_STATS_N_PLUS_ONE_THRESHOLD',
+            N_PLUS_ONE_THRESHOLD)
+
+    def __call__(self, request):
+        cache_before = cache_stats()
+        with record_queries(self.threshold) as recorder:
+            response = self.get_response(request)
+        cache_after = cache_stats()
+
+        match = getattr(request, 'resolver_match', None)
+        report = recorder.report(match.view_name if match else None)
+        report['path'] = request.path
+        report['cache'] = {
+            name: total - cache_before.get(name, 0)
+            for name, total in cache_after.items()
+            if total != cache_before.get(name, 0)
+        }
+
+        if settings.DEBUG:
+            self.add_headers(response, report)
+        elif report['n_plus_one']:
+            logger.warning(json.dumps(report, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(report, ensure_ascii=False))
+
+        return response
+
+    @staticmethod
+    def add_headers(response, report):
+        response['X-Query-Count'] = str(report['queries'])
+        response['X-Query-Time-Ms'] = str(report['sql_time_ms'])
+        response['X-Query-Repeated'] = str(sum(report['repeated'].values()))
+        for name in ('hits', 'misses', 'recomputes'):
+            response[f'X-Cache-{name.title()}'] = str(
+                report['cache'].get(name, 0))
+        if report['n_plus_one']:
+            response['X-Query-N-Plus-One'] = '; '.join(
+                f"{item['origin']} x{item['count']}"
+                for item in report['n_plus_one'].values())
@@ -0,0 +1,23 @@
+class CacheRouter:
+    """Таблица SharedDatabaseCache живёт в отдельной базе 'cache'.
+
+    Так запись в кеш не ждёт блокировку основной базы, а запросы к кешу
+    не смешиваются с запросами страниц.
+    """
+
+    cache_app_label = 'django_cache'
+    cache_db = 'cache'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.cache_app_label:
+            return self.cache_db
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, **hints):
+        if app_label == self.cache_app_label:
+            return db == self.cache_db
+        if db == self.cache_db:
+            return False
+        return None
@@ -0,0 +1,19 @@
+from django.db import connection
+from django.test import TestCase
+
+from ..backends.sqlite3.base import DEFAULT_PRAGMAS
+
+
+class SqliteBackendTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Новое соединение получает прагмы из DEFAULT_PRAGMAS."""
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'),
+                         DEFAULT_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'),
+                         DEFAULT_PRAGMAS['cache_size'])
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
+
+from posts.models import Post
+
+from ..apps import create_cache_tables
+from ..cache import SharedDatabaseCache, TwoTierCache, get_or_compute
+
+
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.SharedDatabaseCache',
+        'LOCATION': 'yatube_cache',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 3},
+    },
+}
+
+
+class TwoTierCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Post.objects.create(
+            text='Тестовый текст',
+            author=get_user_model().objects.create_user(username='TestUser'),
+        )
+
+    def setUp(self):
+        cache.clear()
+        cache.reset_stats()
+        self.shared = caches['shared']
+
+    def test_default_is_two_tier(self):
+        """Кеш по умолчанию двухуровневый, в тестах общий уровень в LocMem."""
+        self.assertIsInstance(caches['default'], TwoTierCache)
+        self.assertIs(cache.shared, self.shared)
+
+    def test_local_tier_only_for_prefixes(self):
+        """В процессе держатся только ключи с разрешёнными префиксами."""
+        cache.set('posts:page:key', 'page')
+        cache.set('posts:count:all', 1, None)
+        self.shared.delete_many(['posts:page:key', 'posts:count:all'])
+
+        self.assertEqual(cache.get('posts:page:key'), 'page')
+        self.assertIsNone(cache.get('posts:count:all'))
+        self.assertEqual(cache.stats(), {
+            'hits': 1, 'local_hits': 1, 'misses': 1})
+
+    def test_incr_keeps_counters(self):
+        """incr идёт в общий уровень и не ставит срок жизни ключу."""
+        cache.set('counter', 1, None)
+        self.assertEqual(cache.incr('counter', 2), 3)
+        self.assertEqual(cache.decr('counter'), 2)
+        self.assertIsNone(self.shared.get_backend_timeout())
+
+    def test_get_or_compute_single_flight(self):
+        """Пока пересчитывает один, другие ждут его результат."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 'value'
+
+        self.assertEqual(cache.get_or_compute('key', compute, 60), 'value')
+        self.assertEqual(cache.get_or_compute('key', compute, 60), 'value')
+        self.assertEqual(len(calls), 1)
+
+        self.shared.add('other:lock', 1)
+        with mock.patch.object(cache, 'lock_wait', 0):
+            cache.get_or_compute('other', compute, 60)
+        self.assertEqual(cache.stats()['lock_waits'], 1)
+        self.assertEqual(cache.stats()['recomputes'], 2)
+
+    def test_early_expiration(self):
+        """Близкий к концу срока дорогой ключ пересчитывается заранее,
+        а занятая блокировка отдаёт старое значение."""
+        cache.set('key', ('old', 10.0, None))
+        self.assertEqual(cache.get_or_compute('key', lambda: 'new'), 'old')
+
+        cache.set('key', ('old', 10.0, 1.0))
+        self.shared.add('key:lock', 1)
+        self.assertEqual(cache.get_or_compute('key', lambda: 'new'), 'old')
+        self.shared.delete('key:lock')
+        self.assertEqual(cache.get_or_compute('key', lambda: 'new'), 'new')
+        self.assertEqual(cache.stats()['early_recomputes'], 2)
+
+    def test_none_is_not_cached(self):
+        """compute, вернувший None, ничего не кладёт в кеш."""
+        self.assertIsNone(get_or_compute('key', lambda: None))
+        self.assertIsNone(cache.get('key'))
+
+    @override_settings(DEBUG=True)
+    def test_page_cache_metrics(self):
+        """Страница для гостя считается один раз, метрики в заголовках."""
+        client = Client()
+        first = client.get('/')
+        second = client.get('/')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['X-Cache-Recomputes'], '1')
+        self.assertEqual(second['X-Cache-Recomputes'], '0')
+
+
+class SharedDatabaseCacheTests(TestCase):
+    databases = {'default', 'cache'}
+
+    @classmethod
+    def setUpTestData(cls):
+        # Тестовый раннер подменяет CACHES, и migrate таблицу не создал.
+        with override_settings(CACHES=SHARED_CACHES):
+            create_cache_tables()
+
+    def setUp(self):
+        self.cache = SharedDatabaseCache(
+            'yatube_cache', SHARED_CACHES['default'])
+
+    def test_table_in_cache_database(self):
+        """Таблица кеша живёт в отдельной базе cache."""
+        self.cache.set('key', 'value')
+        with self.assertNumQueries(0, using='default'):
+            self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_add_and_incr(self):
+        """add не перетирает ключ, incr сохраняет бессрочность."""
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_incr_keeps_timeout(self):
+        """incr не продлевает срок ключа."""
+        self.cache.set('count', 1, 60)
+        self.cache.incr('count')
+        with mock.patch('django.core.cache.backends.db.timezone.now',
+                        return_value=timezone.now() + timedelta(minutes=2)):
+            self.assertIsNone(self.cache.get('count'))
+
+    def test_cull_keeps_keys_without_timeout(self):
+        """Переполнение вытесняет только ключи со сроком."""
+        self.cache.set('views', 7, None)
+        for i in range(6):
+            self.cache.set(f'page:{i}', i, 60)
+
+        self.assertEqual(self.cache.get('views'), 7)
+        self.assertLess(
+            len(self.cache.get_many([f'page:{i}' for i in range(6)])), 6)
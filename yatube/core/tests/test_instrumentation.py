@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.http import HttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+
+from posts.models import Post
+
+from ..instrumentation import fingerprint, record_queries
+from ..middleware.query_stats import QueryStatsMiddleware
+
+
+class QueryStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        for i in range(5):
+            Post.objects.create(
+                text='Тестовый текст',
+                author=User.objects.create_user(username=f'TestUser{i}'),
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_fingerprint_drops_literals(self):
+        """Отпечаток не зависит от литералов в запросе."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND s = 'a'"),
+            fingerprint("SELECT * FROM t WHERE id = 25 AND s = 'bb'"))
+
+    def test_n_plus_one_points_to_template(self):
+        """Повторные запросы из шаблона помечаются как N+1 с местом."""
+        with record_queries(origins=True) as recorder:
+            for post in Post.objects.all():
+                render_to_string('posts/includes/block.html', {'post': post})
+
+        found = list(recorder.n_plus_one().values())
+        self.assertEqual(recorder.count, 6)
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0]['count'], 5)
+        self.assertEqual(found[0]['origin'], 'posts/includes/block.html:7')
+
+    def test_origins_only_for_repeats(self):
+        """Без DEBUG и QUERY_STATS_ORIGINS стек обходят только повторы
+        от порога N+1, и N+1 всё равно находится."""
+        with mock.patch('core.instrumentation.template_origin') as origin:
+            with record_queries() as recorder:
+                Post.objects.count()
+            origin.assert_not_called()
+
+            with override_settings(QUERY_STATS_ORIGINS=True):
+                with record_queries():
+                    Post.objects.count()
+            origin.assert_called_once()
+
+        with record_queries() as recorder:
+            for post in Post.objects.all():
+                render_to_string('posts/includes/block.html', {'post': post})
+        found = list(recorder.n_plus_one().values())
+        self.assertEqual(found[0]['count'], 5)
+        self.assertEqual(found[0]['origin'], 'posts/includes/block.html:7')
+
+    @override_settings(DEBUG=True)
+    def test_headers_in_debug(self):
+        """В режиме отладки статистика отдаётся в заголовках."""
+        response = self.guest_client.get('/')
+
+        self.assertIn('X-Query-Count', response)
+        self.assertIn('X-Query-Time-Ms', response)
+        self.assertNotIn('X-Query-N-Plus-One', response)
+
+    def test_n_plus_one_logged_in_production(self):
+        """Без отладки N+1 из шаблона уходит в лог предупреждением."""
+        def view(request):
+            return HttpResponse(''.join(
+                render_to_string('posts/includes/block.html', {'post': post})
+                for post in Post.objects.all()))
+
+        with self.assertLogs('yatube.queries', level='WARNING') as logs:
+            QueryStatsMiddleware(view)(RequestFactory().get('/'))
+        self.assertIn('posts/includes/block.html:7', logs.output[0])
+
+    def test_log_in_production(self):
+        """Без отладки статистика пишется в лог yatube.queries."""
+        with self.assertLogs('yatube.queries', level='INFO') as logs:
+            response = self.guest_client.get('/')
+
+        self.assertNotIn('X-Query-Count', response)
+        self.assertIn('"view": "posts:index"', logs.output[0])
@@ -1,16 +1,166 @@
-from django.contrib import admin
+from functools import partial
 
-from .models import Post, Group
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import ValidationError
+
+from .counts import estimated_count
+from .models import Post, Group, User
+from .purging import purge_author, purge_plan
+from .regrouping import regroup_posts
+from .search import fts_enabled, match_expression, matching_ids
+from .utils import CountedPaginator
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит, подпись которого берётся из уже загруженного объекта.
+
+    Обычный AutocompleteSelect ищет выбранное значение запросом, и в
+    list_editable это запрос на каждую строку списка.
+    """
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        if selected is None or set(value) != {str(selected.pk)}:
+            return super().optgroups(name, value, attr)
+
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, "", "", False, 0))
+        label = self.choices.field.label_from_instance(selected)
+        options.append(self.create_option(
+            name, selected.pk, label, True, len(options)))
+        return [(None, options, 0)]
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label="Группа")
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ("pk", "text", "pub_date", "author", "group")
+    list_display = ("pk", "text", "pub_date", "author", "group", "views")
     list_editable = ("group",)
+    list_select_related = ("author", "group")
     search_fields = ("text",)
     list_filter = ("pub_date",)
+    date_hierarchy = "pub_date"
+    autocomplete_fields = ("author", "group")
+    show_full_result_count = False
     empty_value_display = "-пусто-"
+    action_form = PostActionForm
+    actions = ("move_to_group", "clear_group")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("text_html")
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs["widget"] = LoadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get("using"))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        base = super().get_changelist_form(request, **kwargs)
+
+        class ChangeListForm(base):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                # Группа строки уже пришла через list_select_related.
+                for name, field in self.fields.items():
+                    widget = getattr(field.widget, "widget", field.widget)
+                    if isinstance(widget, LoadedAutocompleteSelect):
+                        widget.selected = (
+                            self.instance._meta.get_field(name)
+                            .get_cached_value(self.instance, None))
+
+        return ChangeListForm
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Полный COUNT(*) на каждой странице списка заменяем оценкой,
+        # которая дотягивается до страницы за открытой.
+        try:
+            page = max(int(request.GET.get(PAGE_VAR, 0)), 0)
+        except ValueError:
+            page = 0
+        count = partial(estimated_count, queryset,
+                        reach=(page + 2) * per_page)
+        return CountedPaginator(
+            queryset, per_page, count,
+            orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+
+    def move_to_group(self, request, queryset):
+        try:
+            group = PostActionForm.base_fields["group"].clean(
+                request.POST.get("group"))
+        except ValidationError:
+            group = None
+        if group is None:
+            self.message_user(request, "Выберите группу для переноса",
+                              messages.WARNING)
+            return
+        moved = regroup_posts(queryset, group)
+        self.message_user(
+            request, f"Перенесено в группу {group}: {moved} постов")
+    move_to_group.short_description = "Перенести в выбранную группу"
+    move_to_group.allowed_permissions = ("change",)
+
+    def clear_group(self, request, queryset):
+        moved = regroup_posts(queryset, None)
+        self.message_user(request, f"Группа убрана у {moved} постов")
+    clear_group.short_description = "Убрать группу"
+    clear_group.allowed_permissions = ("change",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # LIKE '%q%' по всей таблице заменяем поиском по индексу FTS5.
+        if not fts_enabled() or match_expression(search_term) is None:
+            return super().get_search_results(
+                request, queryset, search_term)
+
+        return queryset.filter(pk__in=matching_ids(search_term)), False
 
 
 admin.site.register(Post, PostAdmin)
 
-admin.site.register(Group)
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ("pk", "title", "slug", "posts_count")
+    search_fields = ("title", "slug")
+
+
+admin.site.register(Group, GroupAdmin)
+
+
+class AuthorAdmin(UserAdmin):
+    actions = ("purge_dry_run", "purge")
+
+    def purge_dry_run(self, request, queryset):
+        for author in queryset:
+            plan = purge_plan(author)
+            self.message_user(
+                request,
+                f"{plan['author']}: будет удалено постов {plan['posts']}, "
+                f"групп затронуто {len(plan['groups'])}")
+    purge_dry_run.short_description = "Показать, что удалит быстрое удаление"
+
+    def purge(self, request, queryset):
+        # Посты удаляются пачками сырых DELETE, а не коллектором каскада,
+        # который грузит все посты автора в память.
+        users = list(queryset)
+        deleted = sum(purge_author(author) for author in users)
+        self.message_user(
+            request,
+            f"Удалено пользователей: {len(users)}, постов: {deleted}")
+    purge.short_description = "Быстро удалить пользователей с постами"
+    purge.allowed_permissions = ("delete",)
+
+
+admin.site.unregister(User)
+admin.site.register(User, AuthorAdmin)
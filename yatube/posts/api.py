@@ -0,0 +1,120 @@
+from django.http import JsonResponse
+
+from .conditional import (conditional_page, group_exists, group_scopes,
+                          index_scopes, post_detail_scopes, profile_exists,
+                          profile_scopes)
+from .constants import POSTS_API_MAX_PAGE_LIM, POSTS_API_PAGE_LIM
+from .lookups import authors, groups
+from .models import Post
+from .utils import CURSOR_AFTER, decode_cursor, encode_cursor
+
+
+# Поле ответа -> выражение для .values()
+API_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "pub_date": "pub_date",
+    "author": "author__username",
+    "group": "group__slug",
+}
+
+
+class ApiError(Exception):
+    pass
+
+
+def selected_fields(request):
+    """Поля из ?fields=a,b в порядке запроса; по умолчанию все."""
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(API_FIELDS)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError(f"Неизвестные поля: {', '.join(unknown)}")
+    return fields
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get("limit", POSTS_API_PAGE_LIM))
+    except ValueError:
+        raise ApiError("limit должен быть числом")
+    return max(1, min(limit, POSTS_API_MAX_PAGE_LIM))
+
+
+def serialize(rows, fields):
+    return [
+        {name: row[API_FIELDS[name]] for name in fields}
+        for row in rows
+    ]
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status,
+                        json_dumps_params={"ensure_ascii": False})
+
+
+def not_found(message):
+    return json_response({"error": message}, status=404)
+
+
+def feed(request, posts):
+    """Страница ленты по курсору: словари из .values(), без моделей."""
+    try:
+        fields = selected_fields(request)
+        limit = page_limit(request)
+    except ApiError as error:
+        return json_response({"error": str(error)}, status=400)
+
+    after = decode_cursor(request.GET.get(CURSOR_AFTER))
+    if after is not None:
+        posts = posts.filter(pk__lt=after)
+    lookups = {API_FIELDS[name] for name in fields} | {"id"}
+    rows = list(posts.order_by("-id").values(*lookups)[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
+
+    return json_response({
+        "results": serialize(rows, fields),
+        "next": next_cursor,
+    })
+
+
+@conditional_page(index_scopes)
+def index_feed(request):
+    return feed(request, Post.objects.all())
+
+
+@conditional_page(group_scopes, group_exists)
+def group_feed(request, slug):
+    group = groups.get(slug)
+    if group is None:
+        return not_found("Группа не найдена")
+    return feed(request, Post.objects.filter(group=group))
+
+
+@conditional_page(profile_scopes, profile_exists)
+def profile_feed(request, username):
+    author = authors.get(username)
+    if author is None:
+        return not_found("Автор не найден")
+    return feed(request, Post.objects.filter(author=author))
+
+
+@conditional_page(post_detail_scopes)
+def post_detail(request, post_id):
+    try:
+        fields = selected_fields(request)
+    except ApiError as error:
+        return json_response({"error": str(error)}, status=400)
+
+    row = (Post.objects.filter(pk=post_id)
+           .values(*{API_FIELDS[name] for name in fields}).first())
+    if row is None:
+        return not_found("Пост не найден")
+
+    return json_response(serialize([row], fields)[0])
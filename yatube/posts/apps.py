@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = "posts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import restore_triggers
+
+        post_migrate.connect(restore_triggers, sender=self,
+                             dispatch_uid="posts.restore_triggers")
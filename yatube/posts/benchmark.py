@@ -0,0 +1,93 @@
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+
+from core.instrumentation import record_queries
+
+
+BENCHMARK_CACHE = "yatube-benchmark"
+
+
+def percentiles(samples):
+    """Сводка по замерам в миллисекундах."""
+    ordered = sorted(samples)
+
+    def rank(share):
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+    return {
+        "p50_ms": round(rank(0.5) * 1000, 3),
+        "p90_ms": round(rank(0.9) * 1000, 3),
+        "p99_ms": round(rank(0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def measure(call, repeat, cold=True):
+    """Время repeat вызовов call и число запросов первого из них."""
+    if cold:
+        cache.clear()
+    with record_queries() as recorder:
+        call()
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return {"queries": recorder.count, **percentiles(samples)}
+
+
+def environment():
+    return {
+        "created": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "vendor": connection.vendor,
+    }
+
+
+@contextmanager
+def isolated_cache():
+    """Кеш в памяти процесса вместо общего: замеры очищают его, не
+    задевая кеш работающего сайта и тестов."""
+    with override_settings(CACHES={
+        "default": {**settings.TWO_TIER_CACHE, "LOCATION": BENCHMARK_CACHE},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": BENCHMARK_CACHE,
+            "TIMEOUT": None,
+        },
+    }):
+        yield
+
+
+@contextmanager
+def benchmark_database():
+    """Отдельная файловая база и кеш для замеров, база удаляется после
+    них."""
+    workdir = tempfile.mkdtemp(prefix="yatube-bench-")
+    connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(
+        workdir, "bench.sqlite3")
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with isolated_cache():
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        os.rmdir(workdir)
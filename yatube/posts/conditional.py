@@ -0,0 +1,108 @@
+from functools import wraps
+from hashlib import md5
+
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response, patch_vary_headers,
+                                quote_etag)
+from django.utils.http import http_date
+
+from .feed import subscription_scope
+from .fragment_cache import post_scope
+from .lookups import authors, groups
+from .models import Post
+from .page_cache import group_page_scope, page_scopes, profile_page_scope
+from .versions import last_changed, scope_versions
+
+
+def index_scopes():
+    return page_scopes("index")
+
+
+def group_scopes(slug):
+    scope = group_page_scope(slug)
+    return None if scope is None else page_scopes(scope)
+
+
+def group_exists(slug):
+    return groups.exists(slug)
+
+
+def group_viewer_scopes(user):
+    # Кнопка подписки на странице группы у каждого своя.
+    return (subscription_scope(user.pk),)
+
+
+def profile_scopes(username):
+    scope = profile_page_scope(username)
+    return None if scope is None else page_scopes(scope)
+
+
+def profile_exists(username):
+    return authors.exists(username)
+
+
+def post_detail_scopes(post_id):
+    # Деталь поста показывает и счётчик постов автора, поэтому
+    # зависит ещё и от области профиля.
+    author_id = (Post.objects.filter(pk=post_id)
+                 .values_list("author_id", flat=True).first())
+    if author_id is None:
+        return None
+    return (*page_scopes(f"profile:{author_id}"), post_scope(post_id))
+
+
+def conditional_page(scopes_func, exists_func=None,
+                     viewer_scopes_func=None):
+    """ETag и Last-Modified по реестру изменений без рендера страницы.
+
+    scopes_func получает kwargs view и возвращает области версий,
+    от которых зависит страница, или None, если объекта нет - тогда
+    view сам ответит 404. viewer_scopes_func добавляет для
+    авторизованного пользователя области его личной части страницы.
+    HEAD отвечается одними заголовками, если exists_func подтвердит,
+    что объект есть.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            scopes = scopes_func(**kwargs)
+            if scopes is None:
+                return view(request, *args, **kwargs)
+
+            params = "&".join(sorted(
+                f"{name}={value}" for name, values in request.GET.lists()
+                for value in values))
+            viewer = ""
+            if request.user.is_authenticated:
+                # Формы страницы несут CSRF-токен: после его смены (вход
+                # заново) 304 оставил бы в браузере форму со старым.
+                viewer = (f"{request.user.pk}:"
+                          f"{request.META.get('CSRF_COOKIE', '')}")
+                if viewer_scopes_func is not None:
+                    scopes = (*scopes, *viewer_scopes_func(request.user))
+            etag = quote_etag(md5(
+                f"{scope_versions(*scopes)}|{params}|{viewer}".encode()
+            ).hexdigest())
+            last_modified = int(last_changed(*scopes))
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                if request.method == "HEAD" and (
+                        exists_func is None or exists_func(**kwargs)):
+                    response = HttpResponse()
+                else:
+                    response = view(request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                response["ETag"] = etag
+                response["Last-Modified"] = http_date(last_modified)
+                patch_vary_headers(response, ("Cookie",))
+            return response
+
+        return wrapper
+
+    return decorator
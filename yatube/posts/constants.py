@@ -3,3 +3,17 @@ POSTS_INDEX_PAGE_LIM = 10
 POSTS_GROUP_POSTS_LIM = 100
 POSTS_GROUP_POSTS_PAGE_LIM = 10
 POSTS_TEXT_LIM = 15
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 60
+POSTS_SEARCH_PAGE_LIM = 10
+POSTS_API_PAGE_LIM = 20
+POSTS_API_MAX_PAGE_LIM = 100
+POSTS_VIEWS_FLUSH_INTERVAL = 60
+POSTS_VIEWS_FLUSH_BATCH = 500
+POSTS_LOOKUP_CACHE_SIZE = 1024
+POSTS_LOOKUP_CACHE_TTL = 5 * 60
+POSTS_LOOKUP_NEGATIVE_TTL = 60
+POSTS_EXCERPT_LIM = 300
+POSTS_ADMIN_COUNT_CAP = 10000
+POSTS_FEED_PAGE_LIM = 10
+POSTS_TIMELINE_SIZE = 1000
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from .counts import forget_counts
+from .models import AuthorStats, Group, Post, User
+
+
+def _not_below_zero(counters, delta):
+    # Разошедшийся счётчик не должен ронять удаление поста CHECK-ом,
+    # его поправит reconcile_post_counters.
+    if delta < 0:
+        return counters.filter(posts_count__gte=-delta)
+    return counters
+
+
+def bump_group_counter(group_id, delta):
+    if group_id is None:
+        return
+    _not_below_zero(Group.objects.filter(pk=group_id), delta).update(
+        posts_count=F("posts_count") + delta)
+
+
+def bump_author_counter(author_id, delta):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    updated = _not_below_zero(stats, delta).update(
+        posts_count=F("posts_count") + delta)
+
+    # Строки ещё нет: заводим её по реальным данным. При удалении не
+    # создаём, автор может удаляться тем же каскадом.
+    if not updated and delta > 0:
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                "posts_count":
+                    Post.objects.filter(author_id=author_id).count(),
+            })
+
+
+@transaction.atomic
+def reconcile_counters():
+    """Сверяет счётчики с реальными данными, возвращает число правок.
+
+    Числа постов в кеше после коммита забываются все: их могли сбить
+    те же гонки, что и строки в базе.
+    """
+    group_ids = []
+    fixed_groups = 0
+    for group in Group.objects.annotate(total=Count("posts")):
+        group_ids.append(group.pk)
+        if group.posts_count != group.total:
+            Group.objects.filter(pk=group.pk).update(posts_count=group.total)
+            fixed_groups += 1
+
+    totals = dict(
+        Post.objects.values_list("author").annotate(total=Count("id"))
+        .order_by())
+    stored = dict(AuthorStats.objects.values_list("author", "posts_count"))
+    author_ids = list(User.objects.values_list("pk", flat=True))
+    fixed_authors = 0
+    for author_id in author_ids:
+        total = totals.get(author_id, 0)
+        if stored.get(author_id, 0) == total:
+            continue
+        AuthorStats.objects.update_or_create(
+            author_id=author_id, defaults={"posts_count": total})
+        fixed_authors += 1
+
+    transaction.on_commit(lambda: forget_counts(group_ids, author_ids))
+    return fixed_groups, fixed_authors
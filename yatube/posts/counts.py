@@ -0,0 +1,91 @@
+from django.core.cache import cache
+
+from .constants import POSTS_ADMIN_COUNT_CAP, POSTS_COUNT_CACHE_TIMEOUT
+from .models import AuthorStats, Group, Post
+
+
+COUNT_KEY_PREFIX = "posts:count"
+FORGET_BATCH_SIZE = 500
+
+
+def count_key(group_id=None, author_id=None):
+    if group_id is not None:
+        return f"{COUNT_KEY_PREFIX}:group:{group_id}"
+    if author_id is not None:
+        return f"{COUNT_KEY_PREFIX}:author:{author_id}"
+    return f"{COUNT_KEY_PREFIX}:all"
+
+
+def _stored_count(group_id=None, author_id=None):
+    # Счётчики групп и авторов уже хранятся в базе: при промахе берём
+    # их по первичному ключу, COUNT(*) остаётся только для всей ленты.
+    if group_id is not None:
+        counters = Group.objects.filter(pk=group_id)
+    elif author_id is not None:
+        counters = AuthorStats.objects.filter(author_id=author_id)
+    else:
+        return Post.objects.count()
+    return counters.values_list("posts_count", flat=True).first() or 0
+
+
+def post_count(group=None, author=None):
+    """Число постов из кеша; при промахе — один запрос к базе.
+
+    Сдвиг, пропущенный из-за промаха в другом процессе, живёт не дольше
+    POSTS_COUNT_CACHE_TIMEOUT: incr срок ключа не продлевает.
+    """
+    group_id = getattr(group, "pk", group)
+    author_id = getattr(author, "pk", author)
+    key = count_key(group_id, author_id)
+
+    value = cache.get(key)
+    if value is None:
+        value = _stored_count(group_id, author_id)
+        cache.set(key, value, POSTS_COUNT_CACHE_TIMEOUT)
+
+    return value
+
+
+def estimated_count(posts, cap=POSTS_ADMIN_COUNT_CAP, reach=0):
+    """Число постов для списка админки без полного COUNT(*).
+
+    Без фильтров число берётся из post_count, с фильтрами считается
+    не дальше max(cap, reach) строк. reach - конец страницы, следующей
+    за открытой: с каждой страницы видна ещё одна, так что дальние
+    страницы достижимы, а запрос ограничен глубиной листания.
+    """
+    if not posts.query.where:
+        return post_count()
+    return posts[:max(cap, reach)].count()
+
+
+def _shift(key, delta):
+    # Отсутствующий ключ не трогаем: его честно посчитает post_count.
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        pass
+
+
+def shift_counts(delta, group_id=None, author_id=None):
+    """Сдвигает общий счётчик и счётчики группы и автора на delta."""
+    _shift(count_key(), delta)
+    if group_id is not None:
+        _shift(count_key(group_id=group_id), delta)
+    if author_id is not None:
+        _shift(count_key(author_id=author_id), delta)
+
+
+def shift_group_count(group_id, delta):
+    _shift(count_key(group_id=group_id), delta)
+
+
+def forget_counts(group_ids=(), author_ids=()):
+    """Забывает общий счётчик и счётчики групп и авторов после
+    массовых операций в обход сигналов."""
+    keys = [count_key()]
+    keys += [count_key(group_id=group_id) for group_id in group_ids
+             if group_id is not None]
+    keys += [count_key(author_id=author_id) for author_id in author_ids]
+    for first in range(0, len(keys), FORGET_BATCH_SIZE):
+        cache.delete_many(keys[first:first + FORGET_BATCH_SIZE])
@@ -0,0 +1,65 @@
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Post
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ("id", "text", "pub_date", "author__username", "group__slug")
+
+
+def _day_start(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Некорректная дата: {value!r}, нужен YYYY-MM-DD")
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(date_from=None, date_to=None, group=None, author=None):
+    """Посты для выгрузки; даты включительно, в формате YYYY-MM-DD.
+
+    Фильтр по датам идёт по индексу pub_date, а не по pub_date__date.
+    """
+    posts = Post.objects.order_by("id")
+    if date_from:
+        posts = posts.filter(pub_date__gte=_day_start(date_from))
+    if date_to:
+        posts = posts.filter(
+            pub_date__lt=_day_start(date_to) + timedelta(days=1))
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    return posts.values_list(*EXPORT_FIELDS)
+
+
+def ndjson_lines(rows):
+    """Строки NDJSON по одной на пост, без материализации выборки."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for pk, text, pub_date, username, slug in rows:
+        yield (encoder.encode({
+            "id": pk,
+            "text": text,
+            "pub_date": pub_date,
+            "author": username,
+            "group": slug,
+        }) + "\n").encode()
+
+
+def gzip_stream(chunks, level=6):
+    """Сжимает поток байтов в gzip на лету, буфер - один блок zlib."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(**filters):
+    rows = export_queryset(**filters).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return gzip_stream(ndjson_lines(rows))
@@ -0,0 +1,70 @@
+"""Общая лента подписок пользователя на группы.
+
+Лента - слияние потоков групп, упорядоченных по id, как в group_posts.
+Каждый поток - не больше limit + 1 id одной группы за курсором; такой
+запрос читает только индекс внешнего ключа group_id и не зависит от
+длины истории. Потоки сливаются кучей (heapq.merge), а полные строки
+постов для страницы достаются одним запросом.
+"""
+import heapq
+from itertools import islice
+
+from .models import Group, Post
+from .utils import CursorPage, CursorPaginator, decode_cursor
+from .versions import bump_versions
+
+
+def subscription_scope(user_id):
+    """Область версий подписок одного пользователя."""
+    return f"subscriptions:{user_id}"
+
+
+def invalidate_subscriptions(user_id):
+    bump_versions(subscription_scope(user_id))
+
+
+def subscribed_group_ids(user):
+    return list(Group.objects.filter(subscriptions__user=user)
+                .values_list("pk", flat=True))
+
+
+def group_stream(group_id, limit, after=None, before=None):
+    """id постов группы за курсором: после after - по убыванию,
+    до before - по возрастанию."""
+    posts = Post.objects.filter(group_id=group_id)
+    if before is not None:
+        posts = posts.filter(pk__gt=before).order_by("id")
+    else:
+        if after is not None:
+            posts = posts.filter(pk__lt=after)
+        posts = posts.order_by("-id")
+    return list(posts.values_list("id", flat=True)[:limit])
+
+
+def merge_streams(streams, limit, reverse=True):
+    """Первые limit id из k упорядоченных потоков через кучу."""
+    return list(islice(heapq.merge(*streams, reverse=reverse), limit))
+
+
+def feed_page(group_ids, per_page, after=None, before=None):
+    """Страница ленты групп group_ids в виде CursorPage."""
+    after_pk = decode_cursor(after)
+    before_pk = decode_cursor(before)
+    streams = [
+        group_stream(group_id, per_page + 1, after_pk, before_pk)
+        for group_id in group_ids
+    ]
+
+    if before_pk is not None:
+        ids = merge_streams(streams, per_page + 1, reverse=False)
+        has_next, has_previous = True, len(ids) > per_page
+        ids = ids[:per_page][::-1]
+    else:
+        ids = merge_streams(streams, per_page + 1)
+        has_next, has_previous = len(ids) > per_page, after_pk is not None
+        ids = ids[:per_page]
+
+    posts = Post.objects.for_list().in_bulk(ids)
+    rows = [posts[pk] for pk in ids if pk in posts]
+    return CursorPage(rows, CursorPaginator(Post.objects.none(), per_page),
+                      has_next, has_previous)
@@ -0,0 +1,33 @@
+from .versions import bump_versions, scope_tokens
+
+
+def post_scope(post_id):
+    return f"fragment:post:{post_id}"
+
+
+def author_scope(author_id):
+    return f"fragment:author:{author_id}"
+
+
+def set_fragment_versions(posts):
+    """Ставит каждому посту fragment_versions - версии самого поста и
+    его автора для ключа фрагмента. Токены всех постов читаются из
+    кеша одним get_many."""
+    scopes = {
+        post.pk: (post_scope(post.pk), author_scope(post.author_id))
+        for post in posts
+    }
+    unique = list(dict.fromkeys(
+        scope for post_scopes in scopes.values() for scope in post_scopes))
+    tokens = dict(zip(unique, scope_tokens(*unique)))
+    for post in posts:
+        post.fragment_versions = ":".join(
+            str(tokens[scope]) for scope in scopes[post.pk])
+
+
+def invalidate_post_fragment(post_id):
+    bump_versions(post_scope(post_id))
+
+
+def invalidate_author_fragments(author_id):
+    bump_versions(author_scope(author_id))
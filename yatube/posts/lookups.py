@@ -0,0 +1,172 @@
+"""Поиск группы по slug и автора по username через LRU в памяти процесса.
+
+Записи живут не дольше POSTS_LOOKUP_CACHE_TTL, промахи (404) —
+POSTS_LOOKUP_NEGATIVE_TTL. Каждая запись помнит токен версии из общего
+кеша: найденный объект - своего id, промах - всего вида. Сигналы на
+изменение Group и User меняют токен объекта и вида, и записи
+сбрасываются во всех процессах, а не только в том, где случилось
+изменение; записи остальных объектов остаются. Токены читаются из
+общего кеша один раз за запрос.
+
+В LRU лежат значения полей, а не экземпляры: каждый вызов получает
+свежий объект, и кеш связанных объектов (например, post_stats) не
+протекает между запросами.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.signals import request_finished, request_started
+from django.http import Http404
+
+from .constants import (POSTS_LOOKUP_CACHE_SIZE, POSTS_LOOKUP_CACHE_TTL,
+                        POSTS_LOOKUP_NEGATIVE_TTL)
+from .models import Group, User
+from .versions import bump_versions, scope_versions
+
+
+MISSING = object()
+
+
+class RequestVersions(threading.local):
+    """Токены версий, прочитанные за текущий запрос потока.
+
+    Вне запроса (команды, фоновые задачи) токены читаются каждый раз.
+    """
+    tokens = None
+
+    def start(self, **kwargs):
+        self.tokens = {}
+
+    def finish(self, **kwargs):
+        self.tokens = None
+
+    def get(self, scope):
+        if self.tokens is None:
+            return scope_versions(scope)
+        if scope not in self.tokens:
+            self.tokens[scope] = scope_versions(scope)
+        return self.tokens[scope]
+
+    def forget(self, *scopes):
+        if self.tokens is not None:
+            for scope in scopes:
+                self.tokens.pop(scope, None)
+
+
+request_versions = RequestVersions()
+request_started.connect(request_versions.start)
+request_finished.connect(request_versions.finish)
+
+
+class LRUCache:
+    """Потокобезопасный LRU с TTL и версией на каждую запись."""
+
+    def __init__(self, maxsize, ttl, negative_ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """Значение (None — закешированный промах) или MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, entry_version, expires = entry
+                if entry_version == version and expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def peek(self, key):
+        """Значение без проверок версии и TTL или MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+        return MISSING if entry is None else entry[0]
+
+    def set(self, key, value, version):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            self._data[key] = (value, version, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Lookup:
+    """Объект модели по уникальному полю через LRUCache."""
+
+    def __init__(self, model, field, scope):
+        self.model = model
+        self.field = field
+        self.scope = scope
+        self.attnames = [
+            model_field.attname
+            for model_field in model._meta.concrete_fields
+        ]
+        self.pk_index = self.attnames.index(model._meta.pk.attname)
+        self.cache = LRUCache(POSTS_LOOKUP_CACHE_SIZE, POSTS_LOOKUP_CACHE_TTL,
+                              POSTS_LOOKUP_NEGATIVE_TTL)
+
+    def object_scope(self, pk):
+        return f"{self.scope}:{pk}"
+
+    def version(self, row):
+        """Токен записи: для найденного объекта - его id, для промаха
+        или пустого места - всего вида."""
+        if row is None or row is MISSING:
+            return request_versions.get(self.scope)
+        return request_versions.get(self.object_scope(row[self.pk_index]))
+
+    def get(self, value):
+        """Объект или None, если его нет."""
+        row = self.cache.get(value, self.version(self.cache.peek(value)))
+        if row is MISSING:
+            row = (self.model._default_manager
+                   .filter(**{self.field: value})
+                   .values_list(*self.attnames).first())
+            self.cache.set(value, row, self.version(row))
+        if row is None:
+            return None
+        return self.model.from_db(None, self.attnames, row)
+
+    def get_or_404(self, value):
+        instance = self.get(value)
+        if instance is None:
+            raise Http404(
+                f"No {self.model._meta.object_name} matches the given query.")
+        return instance
+
+    def exists(self, value):
+        return self.get(value) is not None
+
+    def invalidate(self, pk=None):
+        """Сбрасывает во всех процессах промахи этого вида и запись
+        объекта pk: у него мог смениться slug или username."""
+        scopes = [self.scope]
+        if pk is not None:
+            scopes.append(self.object_scope(pk))
+        request_versions.forget(*scopes)
+        bump_versions(*scopes)
+
+
+groups = Lookup(Group, "slug", "lookup:group")
+authors = Lookup(User, "username", "lookup:user")
@@ -0,0 +1,73 @@
+import json
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from posts.benchmark import benchmark_database, environment, measure
+from posts.constants import POSTS_INDEX_PAGE_LIM
+from posts.models import Group, Post, User
+from posts.rendering import derived_fields
+from posts.seeding import seed_data
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает память и время страницы списка с полными строками "
+            "Post и с Post.objects.for_list() на длинных постах")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument("--text-size", type=int, default=20000,
+                            help="Длина текста каждого поста в символах")
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument("--output", default="bench_list_querysets.json")
+
+    def handle(self, *args, **options):
+        report = {"environment": environment(), "posts": options["posts"],
+                  "text_size": options["text_size"], "lists": {}}
+
+        with benchmark_database():
+            seed_data(max(10, options["posts"] // 50), 10, options["posts"],
+                      seed=1)
+            text = ("Очень длинный пост. " * options["text_size"])[
+                :options["text_size"]]
+            Post.objects.update(text=text, **derived_fields(text))
+
+            for name, posts in self.lists().items():
+                full = posts.select_related("author", "group")
+                slim = posts.for_list()
+                report["lists"][name] = {
+                    "full": self.bench(full, options["repeat"]),
+                    "slim": self.bench(slim, options["repeat"]),
+                }
+                self.stdout.write(
+                    f"{name}: {report['lists'][name]['full']['peak_kb']} -> "
+                    f"{report['lists'][name]['slim']['peak_kb']} КБ, "
+                    f"{report['lists'][name]['full']['p50_ms']} -> "
+                    f"{report['lists'][name]['slim']['p50_ms']} мс")
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчёт записан в {options['output']}"))
+
+    def lists(self):
+        group = Group.objects.order_by("-posts_count").first()
+        author = User.objects.annotate(total=Count("posts")).order_by(
+            "-total").first()
+        return {
+            "index": Post.objects.all(),
+            "group_list": Post.objects.filter(group=group),
+            "profile": Post.objects.filter(author=author),
+        }
+
+    def bench(self, posts, repeat):
+        def page():
+            return list(posts[:POSTS_INDEX_PAGE_LIM])
+
+        tracemalloc.start()
+        page()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"peak_kb": round(peak / 1024, 1),
+                **measure(page, repeat, cold=False)}
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from posts.benchmark import benchmark_database, environment, measure
+from posts.models import Group, Post, User
+from posts.seeding import seed_data
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает стоимость запроса JSON API и HTML-страниц "
+            "для лент и детали поста")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--output", default="bench_posts_api.json")
+
+    def handle(self, *args, **options):
+        report = {"environment": environment(), "posts": options["posts"],
+                  "views": {}}
+
+        with benchmark_database():
+            seed_data(max(10, options["posts"] // 50), 10, options["posts"],
+                      seed=1)
+            client = Client()
+            for name, (html_url, api_url) in self.urls().items():
+                html = measure(lambda: client.get(html_url), options["repeat"])
+                api = measure(lambda: client.get(api_url), options["repeat"])
+                response = client.get(html_url)
+                api_response = client.get(api_url)
+                report["views"][name] = {
+                    "html": {**html, "bytes": len(response.content)},
+                    "api": {**api, "bytes": len(api_response.content)},
+                    "speedup_p50": round(
+                        html["p50_ms"] / max(api["p50_ms"], 0.001), 2),
+                }
+                self.stdout.write(
+                    f"{name}: html {html['p50_ms']} мс, "
+                    f"api {api['p50_ms']} мс")
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчёт записан в {options['output']}"))
+
+    def urls(self):
+        group = Group.objects.order_by("-posts_count").first()
+        author = User.objects.annotate(total=Count("posts")).order_by(
+            "-total").first()
+        post = Post.objects.first()
+        return {
+            "index": (reverse("posts:index"), reverse("posts:api_index")),
+            "group_list": (
+                reverse("posts:group_list", kwargs={"slug": group.slug}),
+                reverse("posts:api_group_list", kwargs={"slug": group.slug})),
+            "profile": (
+                reverse("posts:profile",
+                        kwargs={"username": author.username}),
+                reverse("posts:api_profile",
+                        kwargs={"username": author.username})),
+            "post_detail": (
+                reverse("posts:post_detail", kwargs={"post_id": post.pk}),
+                reverse("posts:api_post_detail", kwargs={"post_id": post.pk})),
+        }
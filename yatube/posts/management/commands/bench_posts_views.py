@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from posts.benchmark import benchmark_database, environment, measure
+from posts.models import Group, Post, User
+from posts.seeding import seed_data
+
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+
+class Command(BaseCommand):
+    help = ("Замеряет перцентили задержки и число запросов views posts "
+            "на базах разного размера и пишет JSON-отчёт")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+",
+                            default=list(DEFAULT_SIZES))
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument("--skew", type=float, default=1.0)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", default="bench_posts_views.json")
+
+    def handle(self, *args, **options):
+        report = {"environment": environment(), "sizes": {}}
+
+        with benchmark_database():
+            for size in sorted(options["sizes"]):
+                missing = size - Post.objects.count()
+                if missing > 0:
+                    seed_data(
+                        max(10, missing // 50), max(5, missing // 1000),
+                        missing, skew=options["skew"], seed=options["seed"])
+                report["sizes"][size] = self.bench_size(options["repeat"])
+                self.stdout.write(f"{size}: готово")
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчёт записан в {options['output']}"))
+
+    def urls(self):
+        group = Group.objects.order_by("-posts_count").first()
+        author = User.objects.annotate(total=Count("posts")).order_by(
+            "-total").first()
+        pages = Post.objects.count() // 10 or 1
+        return {
+            "index": reverse("posts:index"),
+            "index_deep": reverse("posts:index") + f"?page={pages // 2}",
+            "group_list": reverse("posts:group_list",
+                                  kwargs={"slug": group.slug}),
+            "profile": reverse("posts:profile",
+                               kwargs={"username": author.username}),
+            "post_detail": reverse(
+                "posts:post_detail",
+                kwargs={"post_id": Post.objects.first().pk}),
+        }
+
+    def bench_size(self, repeat):
+        client = Client()
+        results = {}
+        for name, url in self.urls().items():
+            results[name] = {
+                "url": url,
+                "cold": measure(lambda: client.get(url), repeat),
+                "warm": measure(lambda: client.get(url), repeat, cold=False),
+            }
+        return results
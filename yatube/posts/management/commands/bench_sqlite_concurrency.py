@@ -0,0 +1,126 @@
+import json
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+
+from core.backends.sqlite3.base import DEFAULT_PRAGMAS
+from posts.benchmark import benchmark_database, environment, percentiles
+from posts.models import Post, User
+from posts.seeding import seed_data
+
+
+# Поведение sqlite3 по умолчанию, с которым сравниваем настроенный backend.
+STOCK_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "busy_timeout": 5000,
+    "temp_store": "DEFAULT",
+}
+
+PROFILES = {
+    "stock": STOCK_PRAGMAS,
+    "tuned": DEFAULT_PRAGMAS,
+}
+
+
+class Command(BaseCommand):
+    help = ("Смешанная нагрузка читателей и писателей на SQLite со штатными "
+            "и настроенными прагмами, отчёт о пропускной способности")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--output",
+                            default="bench_sqlite_concurrency.json")
+
+    def handle(self, *args, **options):
+        report = {"environment": environment(), "profiles": {}}
+
+        with benchmark_database():
+            seed_data(100, 10, options["posts"], seed=1)
+            author_ids = list(User.objects.values_list("pk", flat=True))
+            saved = connection.settings_dict.get("PRAGMAS")
+            try:
+                for name, pragmas in PROFILES.items():
+                    connection.settings_dict["PRAGMAS"] = pragmas
+                    # journal_mode хранится в файле: переключаем его
+                    # новым соединением до старта потоков.
+                    connection.close()
+                    connection.ensure_connection()
+                    report["profiles"][name] = self.run_profile(
+                        options, author_ids)
+                    self.stdout.write(
+                        f"{name}: {report['profiles'][name]['reads_per_s']} "
+                        f"чтений/с, {report['profiles'][name]['writes_per_s']}"
+                        f" записей/с")
+            finally:
+                connection.settings_dict["PRAGMAS"] = saved or {}
+                connection.close()
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчёт записан в {options['output']}"))
+
+    def run_profile(self, options, author_ids):
+        stop = threading.Event()
+        stats = {"read": [], "write": [], "errors": 0}
+        lock = threading.Lock()
+        total = Post.objects.count()
+
+        def read():
+            offset = random.randrange(max(total - 10, 1))
+            list(Post.objects.select_related("author", "group")
+                 [offset:offset + 10])
+
+        def write():
+            with transaction.atomic():
+                Post.objects.create(text="Нагрузочный пост",
+                                    author_id=random.choice(author_ids))
+
+        def worker(kind, call):
+            try:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        call()
+                    except OperationalError:
+                        with lock:
+                            stats["errors"] += 1
+                        continue
+                    with lock:
+                        stats[kind].append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+
+        threads = (
+            [threading.Thread(target=worker, args=("read", read))
+             for _ in range(options["readers"])]
+            + [threading.Thread(target=worker, args=("write", write))
+               for _ in range(options["writers"])])
+        for thread in threads:
+            thread.start()
+        time.sleep(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        duration = options["duration"]
+        return {
+            "readers": options["readers"],
+            "writers": options["writers"],
+            "reads": len(stats["read"]),
+            "writes": len(stats["write"]),
+            "reads_per_s": round(len(stats["read"]) / duration, 1),
+            "writes_per_s": round(len(stats["write"]) / duration, 1),
+            "errors": stats["errors"],
+            "read_latency": percentiles(stats["read"] or [0]),
+            "write_latency": percentiles(stats["write"] or [0]),
+        }
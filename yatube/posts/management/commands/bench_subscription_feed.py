@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts.benchmark import benchmark_database, environment, measure
+from posts.constants import POSTS_FEED_PAGE_LIM
+from posts.feed import feed_page
+from posts.models import Group, Post
+from posts.seeding import seed_data
+
+
+DEFAULT_SUBSCRIPTIONS = (1, 10, 50, 100, 500)
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает ленту подписок через слияние потоков групп "
+            "с group__in и OFFSET при 1-500 подписках")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200000)
+        parser.add_argument("--groups", type=int, default=500)
+        parser.add_argument("--subscriptions", type=int, nargs="+",
+                            default=list(DEFAULT_SUBSCRIPTIONS))
+        parser.add_argument("--depth", type=int, default=50,
+                            help="Номер страницы для глубокого замера")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output",
+                            default="bench_subscription_feed.json")
+
+    def handle(self, *args, **options):
+        report = {"environment": environment(), "posts": options["posts"],
+                  "subscriptions": {}}
+
+        with benchmark_database():
+            seed_data(max(10, options["posts"] // 100), options["groups"],
+                      options["posts"], seed=1)
+            group_ids = list(Group.objects.order_by("pk")
+                             .values_list("pk", flat=True))
+
+            for total in sorted(options["subscriptions"]):
+                subscribed = group_ids[:total]
+                results = self.bench(subscribed, options["depth"],
+                                     options["repeat"])
+                report["subscriptions"][total] = results
+                self.stdout.write(
+                    f"{total}: merge {results['merge_first']['p50_ms']} / "
+                    f"{results['merge_deep']['p50_ms']} мс, "
+                    f"offset {results['offset_first']['p50_ms']} / "
+                    f"{results['offset_deep']['p50_ms']} мс")
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчёт записан в {options['output']}"))
+
+    def bench(self, group_ids, depth, repeat):
+        naive = Paginator(
+            Post.objects.for_list().filter(group__in=group_ids),
+            POSTS_FEED_PAGE_LIM)
+
+        # Курсор глубокой страницы находим, пройдя ленту заранее.
+        deep_after = None
+        page = feed_page(group_ids, POSTS_FEED_PAGE_LIM)
+        for _ in range(depth - 1):
+            if not page.has_next():
+                break
+            deep_after = page.next_cursor
+            page = feed_page(group_ids, POSTS_FEED_PAGE_LIM,
+                             after=deep_after)
+
+        return {
+            "merge_first": measure(
+                lambda: list(feed_page(group_ids, POSTS_FEED_PAGE_LIM)),
+                repeat, cold=False),
+            "merge_deep": measure(
+                lambda: list(feed_page(group_ids, POSTS_FEED_PAGE_LIM,
+                                       after=deep_after)),
+                repeat, cold=False),
+            "offset_first": measure(
+                lambda: list(naive.get_page(1)), repeat, cold=False),
+            "offset_deep": measure(
+                lambda: list(naive.get_page(depth)), repeat, cold=False),
+        }
@@ -0,0 +1,91 @@
+import re
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.instrumentation import record_queries
+from posts.benchmark import isolated_cache
+from posts.models import Group, Post
+from posts.utils import encode_cursor
+
+
+WHERE_RE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+def plan_problems(sql, plan):
+    """Полные сканы и сортировки во временном B-дереве в плане запроса.
+
+    Скан без WHERE допустим: это чтение общей ленты по rowid до LIMIT.
+    """
+    problems = []
+    for detail in plan:
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif detail.startswith("SCAN") and WHERE_RE.search(sql):
+            problems.append(detail)
+    return problems
+
+
+class Command(BaseCommand):
+    help = ("Выполняет views posts, прогоняет их SELECT-запросы через "
+            "EXPLAIN QUERY PLAN и падает на полных сканах и TEMP B-TREE")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("EXPLAIN QUERY PLAN есть только у SQLite")
+
+        with isolated_cache():
+            failed = self.check_urls(options["verbosity"])
+
+        if failed:
+            raise CommandError("Есть запросы без подходящего индекса")
+        self.stdout.write(self.style.SUCCESS("Все планы используют индексы"))
+
+    def check_urls(self, verbosity):
+        failed = False
+        for url in self.urls():
+            for sql, params in self.view_queries(url):
+                plan = self.explain(sql, params)
+                problems = plan_problems(sql, plan)
+                if problems:
+                    failed = True
+                    self.stderr.write(f"{url}: {sql}")
+                    for detail in problems:
+                        self.stderr.write(f"    {detail}")
+                elif verbosity > 1:
+                    self.stdout.write(f"{url}: {' | '.join(plan)}")
+        return failed
+
+    def urls(self):
+        urls = [reverse("posts:index")]
+        post = Post.objects.select_related("author").first()
+        group = Group.objects.first()
+        if group is not None:
+            urls.append(reverse("posts:group_list",
+                                kwargs={"slug": group.slug}))
+        if post is not None:
+            urls.append(reverse("posts:profile",
+                                kwargs={"username": post.author.username}))
+            urls.append(reverse("posts:post_detail",
+                                kwargs={"post_id": post.pk}))
+
+        cursor = encode_cursor(post.pk if post is not None else 0)
+        pages = [f"{url}?page=2" for url in urls[:3]]
+        pages += [f"{url}?after={cursor}" for url in urls[:3]]
+        pages += [f"{url}?before={cursor}" for url in urls[:3]]
+        return urls + pages
+
+    def view_queries(self, url):
+        cache.clear()
+        with record_queries() as recorder:
+            Client().get(url)
+        return [(query.sql, query.params) for query in recorder.queries
+                if query.sql.lstrip().upper().startswith("SELECT")]
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import export_stream
+
+
+class Command(BaseCommand):
+    help = "Потоково выгружает посты в NDJSON, сжатый gzip"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-",
+                            help="Файл для выгрузки, '-' - stdout")
+        parser.add_argument("--from", dest="date_from",
+                            help="Дата публикации от, YYYY-MM-DD")
+        parser.add_argument("--to", dest="date_to",
+                            help="Дата публикации до, YYYY-MM-DD")
+        parser.add_argument("--group", help="slug группы")
+        parser.add_argument("--author", help="username автора")
+
+    def handle(self, *args, **options):
+        try:
+            stream = export_stream(
+                date_from=options["date_from"],
+                date_to=options["date_to"],
+                group=options["group"],
+                author=options["author"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        if options["output"] == "-":
+            self.write(stream, sys.stdout.buffer)
+            return
+        with open(options["output"], "wb") as output:
+            written = self.write(stream, output)
+        self.stderr.write(f"Записано {written} байт в {options['output']}")
+
+    def write(self, stream, output):
+        written = 0
+        for chunk in stream:
+            output.write(chunk)
+            written += len(chunk)
+        return written
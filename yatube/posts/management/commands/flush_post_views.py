@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.view_counter import flush_views
+
+
+class Command(BaseCommand):
+    help = "Сбрасывает накопленные в кеше просмотры постов в базу"
+
+    def handle(self, *args, **options):
+        flushed = flush_views()
+        self.stdout.write(self.style.SUCCESS(
+            f"Обновлено постов: {flushed}"))
@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import IMPORT_BATCH_SIZE, PostImporter, open_rows
+
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = ("Импортирует посты из NDJSON или CSV пачками bulk_create "
+            "с возобновлением после сбоя")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл .ndjson, .csv или их .gz")
+        parser.add_argument("--format", choices=("ndjson", "csv"))
+        parser.add_argument(
+            "--source",
+            help="Имя источника для точки возобновления, "
+                 "по умолчанию - имя файла")
+        parser.add_argument("--batch-size", type=int,
+                            default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"Файл {path} не найден")
+
+        importer = PostImporter(
+            options["source"] or os.path.basename(path),
+            batch_size=options["batch_size"],
+            progress=self.progress,
+        )
+        if importer.checkpoint.position:
+            self.stdout.write(
+                f"Продолжаем с записи {importer.checkpoint.position + 1}")
+
+        stream, rows = open_rows(path, options["format"])
+        with stream:
+            imported = importer.run(rows)
+
+        for number, error in importer.errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f"запись {number}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано {imported}, отклонено {len(importer.errors)}"))
+
+    def progress(self, position, inserted, rate):
+        self.stdout.write(
+            f"обработано {position}: +{inserted}, {rate:.0f} постов/с")
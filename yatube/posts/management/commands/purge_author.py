@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import User
+from posts.purging import PURGE_BATCH_SIZE, purge_author, purge_plan
+
+
+class Command(BaseCommand):
+    help = ("Удаляет пользователя со всеми постами пачками сырых DELETE "
+            "без загрузки постов в память")
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Только показать, что будет удалено")
+        parser.add_argument("--keep-user", action="store_true",
+                            help="Удалить посты, но оставить пользователя")
+        parser.add_argument("--batch-size", type=int,
+                            default=PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(username=options["username"]).first()
+        if author is None:
+            raise CommandError(
+                f"Пользователь {options['username']} не найден")
+
+        plan = purge_plan(author)
+        self.stdout.write(
+            f"{plan['author']}: постов {plan['posts']}, "
+            f"с {plan['first']} по {plan['last']}")
+        for slug, total in sorted(plan["groups"].items(),
+                                  key=lambda item: -item[1]):
+            self.stdout.write(f"  {slug or '-без группы-'}: {total}")
+        if options["dry_run"]:
+            return
+
+        deleted = purge_author(
+            author, batch_size=options["batch_size"],
+            delete_user=not options["keep_user"], progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f"Удалено постов: {deleted}"))
+
+    def progress(self, deleted):
+        self.stdout.write(f"удалено {deleted}")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.search import FTS_TABLE, fts_enabled
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс FTS5 по текстам постов"
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError("Полнотекстовый индекс есть только у SQLite")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+            total = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Индекс перестроен, постов в индексе: {total}"))
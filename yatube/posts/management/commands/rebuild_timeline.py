@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.constants import POSTS_TIMELINE_SIZE
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Собирает буфер последних постов главной страницы заново"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=POSTS_TIMELINE_SIZE)
+
+    def handle(self, *args, **options):
+        timeline = rebuild_timeline(options["size"])
+        if timeline is None:
+            raise CommandError("Буфер сейчас меняет другой процесс")
+        self.stdout.write(self.style.SUCCESS(
+            f"В буфере постов: {len(timeline['ids'])}"))
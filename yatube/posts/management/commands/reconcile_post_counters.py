@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Сверяет счётчики постов групп и авторов с реальными данными"
+
+    def handle(self, *args, **options):
+        fixed_groups, fixed_authors = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Исправлено групп: {fixed_groups}, авторов: {fixed_authors}"))
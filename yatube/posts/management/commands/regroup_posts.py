@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Group, Post, User
+from posts.regrouping import REGROUP_BATCH_SIZE, regroup_posts
+
+
+class Command(BaseCommand):
+    help = ("Переносит посты в другую группу или убирает группу пачками "
+            "UPDATE, например при слиянии групп")
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--to", metavar="SLUG",
+                            help="Группа, в которую перенести посты")
+        target.add_argument("--clear", action="store_true",
+                            help="Убрать у постов группу")
+        parser.add_argument("--from", dest="source", metavar="SLUG",
+                            help="Только посты этой группы")
+        parser.add_argument("--author", metavar="USERNAME",
+                            help="Только посты этого автора")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Только посчитать затронутые посты")
+        parser.add_argument("--batch-size", type=int,
+                            default=REGROUP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options["source"]:
+            posts = posts.filter(group=self.group(options["source"]))
+        if options["author"]:
+            author = User.objects.filter(username=options["author"]).first()
+            if author is None:
+                raise CommandError(
+                    f"Пользователь {options['author']} не найден")
+            posts = posts.filter(author=author)
+        target = None if options["clear"] else self.group(options["to"])
+
+        if options["dry_run"]:
+            if target is None:
+                affected = posts.exclude(group=None).count()
+            else:
+                affected = posts.exclude(group=target).count()
+            self.stdout.write(f"Будет затронуто постов: {affected}")
+            return
+
+        moved = regroup_posts(posts, target,
+                              batch_size=options["batch_size"],
+                              progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f"Перенесено постов: {moved}"))
+
+    def group(self, slug):
+        group = Group.objects.filter(slug=slug).first()
+        if group is None:
+            raise CommandError(f"Группа {slug} не найдена")
+        return group
+
+    def progress(self, moved):
+        self.stdout.write(f"перенесено {moved}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.fragment_cache import post_scope
+from posts.models import Post
+from posts.page_cache import GLOBAL_SCOPE, invalidate_pages
+from posts.rendering import render_posts
+from posts.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = ("Пересчитывает хранимые HTML, анонс и длину текста постов "
+            "(после смены правил рендера или импорта в обход save)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = render_posts(Post.objects.all(), options["batch_size"],
+                               progress=self.progress)
+        if changed:
+            bump_versions(*(post_scope(pk) for pk in changed))
+            invalidate_pages(GLOBAL_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f"Обновлено постов: {len(changed)}"))
+
+    def progress(self, done, total):
+        self.stdout.write(f"посты: {done}/{total}")
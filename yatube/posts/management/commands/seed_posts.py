@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts.seeding import SEED_BATCH_SIZE, seed_data
+
+
+class Command(BaseCommand):
+    help = "Генерирует пользователей, группы и посты для нагрузочных замеров"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--groups", type=int, default=10)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument(
+            "--skew", type=float, default=1.0,
+            help="Показатель Ципфа для авторов и групп, 0 - равномерно")
+        parser.add_argument("--batch-size", type=int,
+                            default=SEED_BATCH_SIZE)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        seed_data(
+            options["users"],
+            options["groups"],
+            options["posts"],
+            skew=options["skew"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            progress=self.progress,
+        )
+        self.stdout.write(self.style.SUCCESS("Данные сгенерированы"))
+
+    def progress(self, kind, done, total):
+        self.stdout.write(f"{kind}: {done}/{total}")
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.6 on 2026-10-18 17:02
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+search_index = import_module('posts.migrations.0007_post_search_index')
+
+# На SQLite AddField пересоздаёт posts_post, и триггеры FTS5 пропадают
+# вместе со старой таблицей.
+TRIGGER_NAMES = (
+    'posts_post_fts_insert',
+    'posts_post_fts_delete',
+    'posts_post_fts_update',
+)
+TRIGGERS_SQL = tuple(
+    f'DROP TRIGGER IF EXISTS {name}' for name in TRIGGER_NAMES
+) + search_index.FORWARD_SQL[1:4]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_import_checkpoint'),
+    ]
+
+    operations = [
+        # При откате RemoveField снова пересоздаёт таблицу.
+        migrations.RunPython(migrations.RunPython.noop,
+                             search_index.run_sql(TRIGGERS_SQL)),
+        migrations.AddField(
+            model_name='post',
+            name='views',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Post's views"),
+        ),
+        migrations.RunPython(search_index.run_sql(TRIGGERS_SQL),
+                             migrations.RunPython.noop),
+    ]
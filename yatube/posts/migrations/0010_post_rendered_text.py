@@ -0,0 +1,70 @@
+# Generated by Django 2.2.6 on 2026-10-18 17:06
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+
+post_views = import_module('posts.migrations.0009_post_views')
+search_index = import_module('posts.migrations.0007_post_search_index')
+
+# Копия posts.rendering на момент миграции: правки живого модуля не
+# должны менять то, что делает уже применённая миграция.
+EXCERPT_LIM = 300
+BATCH_SIZE = 500
+
+
+def derived_fields(text):
+    return {
+        'text_html': str(linebreaksbr(text, autoescape=True)),
+        'excerpt': Truncator(' '.join(text.split())).chars(EXCERPT_LIM),
+        'text_length': len(text),
+    }
+
+
+def render_texts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    last_pk = 0
+    while True:
+        batch = list(Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                     .only('pk', 'text')[:BATCH_SIZE])
+        if not batch:
+            return
+        for post in batch:
+            for name, value in derived_fields(post.text).items():
+                setattr(post, name, value)
+        Post.objects.bulk_update(
+            batch, ('text_html', 'excerpt', 'text_length'))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_views'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             search_index.run_sql(post_views.TRIGGERS_SQL)),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(default='', editable=False, max_length=300, verbose_name="Post's excerpt"),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name="Post's rendered text"),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_length',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Post's text length"),
+        ),
+        migrations.RunPython(search_index.run_sql(post_views.TRIGGERS_SQL),
+                             migrations.RunPython.noop),
+        migrations.RunPython(render_texts, migrations.RunPython.noop),
+    ]
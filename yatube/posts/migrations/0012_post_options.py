@@ -0,0 +1,32 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:20
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+post_views = import_module('posts.migrations.0009_post_views')
+search_index = import_module('posts.migrations.0007_post_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_group_subscription'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-id',), 'verbose_name': 'Post', 'verbose_name_plural': 'Posts'},
+        ),
+        migrations.RunPython(migrations.RunPython.noop,
+                             search_index.run_sql(post_views.TRIGGERS_SQL)),
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=models.TextField(help_text='Введите текст поста', verbose_name="Post's description"),
+        ),
+        migrations.RunPython(search_index.run_sql(post_views.TRIGGERS_SQL),
+                             migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
-from .constants import POSTS_TEXT_LIM
+from .constants import POSTS_EXCERPT_LIM, POSTS_TEXT_LIM
+from .rendering import DERIVED_FIELDS, derived_fields
 
 
 User = get_user_model()
@@ -11,6 +12,8 @@ class Group(models.Model):
     title = models.CharField("Group's title", max_length=200)
     slug = models.SlugField("Group's slug", unique=True)
     description = models.TextField("Group's description")
+    posts_count = models.PositiveIntegerField("Group's posts count",
+                                              default=0, editable=False)
 
     class Meta:
         verbose_name = "Group"
@@ -21,6 +24,26 @@ class Group(models.Model):
         return self.title
 
 
+# Колонки, которые показывает posts/includes/block.html.
+POST_LIST_FIELDS = (
+    "pub_date",
+    "excerpt",
+    "text_length",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+    "group__slug",
+    "group__title",
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_list(self):
+        """Посты для списков: без полного текста и лишних колонок
+        автора (пароль, email) и группы (описание)."""
+        return self.select_related("author", "group").only(*POST_LIST_FIELDS)
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name="Post's description",
                             help_text="Введите текст поста")
@@ -41,11 +64,112 @@ class Post(models.Model):
         related_name="posts",
         verbose_name="Post's group"
     )
+    views = models.PositiveIntegerField("Post's views", default=0,
+                                        editable=False)
+    text_html = models.TextField("Post's rendered text", default="",
+                                 editable=False)
+    excerpt = models.CharField("Post's excerpt", max_length=POSTS_EXCERPT_LIM,
+                               default="", editable=False)
+    text_length = models.PositiveIntegerField("Post's text length",
+                                              default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ("-id",)
+        # Индексы (author, id) и (group, id) не нужны: индекс FK в SQLite
+        # уже хранит rowid, и выборка группы или автора по id идёт по нему
+        # без сортировки.
+        indexes = (
+            models.Index(fields=("pub_date",),
+                         name="posts_post_pub_date_idx"),
+        )
         verbose_name = "Post"
         verbose_name_plural = "Posts"
 
     def __str__(self):
-        return self.text[:POSTS_TEXT_LIM]
+        return (self.excerpt or self.text)[:POSTS_TEXT_LIM]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент чтения: по ней сигналы видят смену группы
+        # без лишнего SELECT перед сохранением.
+        if "group_id" in post.__dict__:
+            post._loaded_group_id = post.group_id
+        return post
+
+    @property
+    def is_truncated(self):
+        return self.text_length > len(self.excerpt)
+
+    def render_text(self):
+        """Пересчитывает хранимые производные от text."""
+        for name, value in derived_fields(self.text).items():
+            setattr(self, name, value)
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or "text" in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                update_fields = {*update_fields, *DERIVED_FIELDS}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_stats",
+        verbose_name="Stats' author"
+    )
+    posts_count = models.PositiveIntegerField("Author's posts count",
+                                              default=0)
+
+    class Meta:
+        verbose_name = "Author stats"
+        verbose_name_plural = "Author stats"
+
+    def __str__(self):
+        return f"{self.author_id}: {self.posts_count}"
+
+
+class GroupSubscription(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="group_subscriptions",
+        verbose_name="Subscriber"
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name="subscriptions",
+        verbose_name="Subscribed group"
+    )
+    created = models.DateTimeField("Subscribed at", auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=("user", "group"),
+                                    name="posts_unique_group_subscription"),
+        )
+        verbose_name = "Group subscription"
+        verbose_name_plural = "Group subscriptions"
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.group_id}"
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField("Import source", max_length=255, unique=True)
+    position = models.PositiveIntegerField("Rows processed", default=0)
+    updated = models.DateTimeField("Checkpoint updated", auto_now=True)
+
+    class Meta:
+        verbose_name = "Import checkpoint"
+        verbose_name_plural = "Import checkpoints"
+
+    def __str__(self):
+        return f"{self.source}: {self.position}"
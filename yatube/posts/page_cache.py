@@ -0,0 +1,114 @@
+from functools import wraps
+from hashlib import md5
+
+from django.http import HttpResponse
+
+from core.cache import get_or_compute
+
+from .constants import POSTS_PAGE_CACHE_TIMEOUT
+from .lookups import authors, groups
+from .utils import CURSOR_AFTER, CURSOR_BEFORE, decode_cursor
+from .versions import bump_versions, scope_versions
+
+
+PAGE_KEY_PREFIX = "posts:page"
+GLOBAL_SCOPE = "all"
+
+
+def page_scopes(scope):
+    """Области версий, от которых зависит страница списка."""
+    return f"page:{GLOBAL_SCOPE}", f"page:{scope}"
+
+
+def invalidate_pages(*scopes):
+    """Сбрасывает закешированные страницы областей."""
+    bump_versions(*(f"page:{scope}" for scope in scopes if scope))
+
+
+def invalidate_post_pages(author_id, *group_ids):
+    """Страницы, на которых виден пост автора author_id из групп."""
+    invalidate_pages(
+        "index",
+        f"profile:{author_id}",
+        *(f"group:{group_id}" for group_id in group_ids
+          if group_id is not None),
+    )
+
+
+def group_page_scope(slug):
+    """Область страницы группы по её id: сигналам поста хватает
+    group_id, а переименование slug не сиротит страницы."""
+    group = groups.get(slug)
+    return None if group is None else f"group:{group.pk}"
+
+
+def profile_page_scope(username):
+    author = authors.get(username)
+    return None if author is None else f"profile:{author.pk}"
+
+
+def page_position(request):
+    """Какую страницу покажет view: курсоры раскодированы, номер приведён
+    к числу так же, как в Paginator.get_page. Мусор в параметрах не
+    плодит копий одной и той же страницы."""
+    after = request.GET.get(CURSOR_AFTER)
+    before = request.GET.get(CURSOR_BEFORE)
+    if after is not None or before is not None:
+        return (f"{CURSOR_AFTER}={decode_cursor(after)}"
+                f"&{CURSOR_BEFORE}={decode_cursor(before)}")
+    try:
+        number = int(request.GET.get("page", 1))
+    except ValueError:
+        number = 1
+    # Номер меньше единицы get_page заменяет последней страницей.
+    return f"page={number if number > 0 else 'last'}"
+
+
+def page_key(view_name, scope, request):
+    digest = md5(page_position(request).encode()).hexdigest()
+    versions = scope_versions(*page_scopes(scope))
+    return f"{PAGE_KEY_PREFIX}:{view_name}:{scope}:{versions}:{digest}"
+
+
+def cache_anonymous_page(view_name, scope_func=None):
+    """Кеширует HTML страницы списка для анонимных посетителей.
+
+    Ключ - view, область (группа или автор) и номер страницы (или
+    курсор). scope_func получает kwargs view и возвращает область или
+    None, если объекта нет - тогда view сам ответит 404. Авторизованным
+    шапка страницы своя, им страница рендерится заново.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ("GET", "HEAD")
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+
+            scope = view_name
+            if scope_func is not None:
+                scope = scope_func(**kwargs)
+                if scope is None:
+                    return view(request, *args, **kwargs)
+            key = page_key(view_name, scope, request)
+
+            response = None
+
+            def render():
+                nonlocal response
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    return response.content, response["Content-Type"]
+                return None
+
+            # Страницу после сброса версий рендерит один процесс,
+            # остальные ждут его или отдают прежнюю копию.
+            cached = get_or_compute(key, render, POSTS_PAGE_CACHE_TIMEOUT)
+            if response is not None:
+                return response
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        return wrapper
+
+    return decorator
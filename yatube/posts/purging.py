@@ -0,0 +1,76 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+
+from .counters import bump_author_counter, bump_group_counter
+from .counts import forget_counts
+from .models import Post
+from .page_cache import invalidate_post_pages
+from .timeline import forget_timeline
+
+
+PURGE_BATCH_SIZE = 1000
+
+
+def purge_plan(author):
+    """Что удалит purge_author: число постов, разбивка по группам и
+    даты первого и последнего поста. Ничего не меняет."""
+    posts = Post.objects.filter(author=author)
+    dates = posts.aggregate(first=Min("pub_date"), last=Max("pub_date"))
+    by_group = dict(
+        posts.values_list("group__slug").annotate(total=Count("id"))
+        .order_by())
+    return {
+        "author": author.username,
+        "posts": sum(by_group.values()),
+        "groups": by_group,
+        **dates,
+    }
+
+
+def _delete_rows(post_ids):
+    # Сырой DELETE без коллектора: на Post никто не ссылается, а
+    # триггер FTS5 сам вычищает индекс поиска.
+    placeholders = ", ".join(["%s"] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {Post._meta.db_table} WHERE id IN ({placeholders})",
+            post_ids)
+        return cursor.rowcount
+
+
+def purge_author(author, batch_size=PURGE_BATCH_SIZE, delete_user=True,
+                 progress=None):
+    """Удаляет посты автора пачками сырых DELETE, затем самого автора.
+
+    Каждая пачка - своя транзакция вместе со сдвигом счётчиков групп и
+    автора, поэтому прерванное удаление можно просто запустить снова.
+    В памяти держатся только id и группы одной пачки; после последней
+    пачки user.delete() уже не находит постов для каскада.
+    """
+    deleted = 0
+    groups = Counter()
+    while True:
+        with transaction.atomic():
+            batch = list(Post.objects.filter(author=author)
+                         .order_by("pk").values_list("pk", "group_id")
+                         [:batch_size])
+            if not batch:
+                break
+            removed = _delete_rows([pk for pk, _ in batch])
+            batch_groups = Counter(group_id for _, group_id in batch)
+            for group_id, total in batch_groups.items():
+                bump_group_counter(group_id, -total)
+            bump_author_counter(author.pk, -removed)
+        groups.update(batch_groups)
+        deleted += removed
+        if progress:
+            progress(deleted)
+
+    forget_counts(groups, [author.pk])
+    forget_timeline()
+    invalidate_post_pages(author.pk, *groups)
+    if delete_user:
+        author.delete()
+    return deleted
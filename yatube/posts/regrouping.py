@@ -0,0 +1,64 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .counters import bump_group_counter
+from .counts import shift_group_count
+from .fragment_cache import post_scope
+from .models import Post
+from .page_cache import invalidate_pages
+from .versions import bump_versions
+
+
+REGROUP_BATCH_SIZE = 1000
+
+
+def regroup_posts(posts, group=None, batch_size=REGROUP_BATCH_SIZE,
+                  progress=None):
+    """Переносит выбранные посты в group (None - убирает группу).
+
+    Каждая пачка - один UPDATE ... WHERE id IN (...) в своей транзакции
+    вместе со счётчиками групп; сигналы save() не срабатывают, поэтому
+    кеши счётчиков, страниц и фрагментов сбрасываются здесь же.
+    Возвращает число перенесённых постов.
+    """
+    group_id = getattr(group, "pk", group)
+    if group_id is None:
+        pending = posts.exclude(group=None)
+    else:
+        pending = posts.exclude(group_id=group_id)
+    moved = 0
+    old_groups = Counter()
+    author_ids = set()
+    while True:
+        with transaction.atomic():
+            batch = list(pending.order_by("pk").values_list(
+                "pk", "group_id", "author_id")[:batch_size])
+            if not batch:
+                break
+            post_ids = [pk for pk, _, _ in batch]
+            updated = Post.objects.filter(pk__in=post_ids).update(
+                group_id=group_id)
+            batch_groups = Counter(old for _, old, _ in batch)
+            for old_group_id, total in batch_groups.items():
+                bump_group_counter(old_group_id, -total)
+            bump_group_counter(group_id, updated)
+        old_groups.update(batch_groups)
+        author_ids.update(author_id for _, _, author_id in batch)
+        bump_versions(*(post_scope(pk) for pk in post_ids))
+        moved += updated
+        if progress:
+            progress(moved)
+
+    if moved:
+        for old_group_id, total in old_groups.items():
+            if old_group_id is not None:
+                shift_group_count(old_group_id, -total)
+        if group_id is not None:
+            shift_group_count(group_id, moved)
+        invalidate_pages(
+            "index",
+            *(f"profile:{author_id}" for author_id in author_ids),
+            *(f"group:{pk}" for pk in {*old_groups, group_id} - {None}),
+        )
+    return moved
@@ -0,0 +1,53 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from .constants import POSTS_EXCERPT_LIM
+
+
+DERIVED_FIELDS = ("text_html", "excerpt", "text_length")
+
+
+def derived_fields(text):
+    """Производные от текста поста, которые хранятся рядом с ним.
+
+    text_html совпадает с выводом {{ text|linebreaksbr }}, excerpt -
+    текст в одну строку, обрезанный до POSTS_EXCERPT_LIM символов.
+    """
+    return {
+        "text_html": str(linebreaksbr(text, autoescape=True)),
+        "excerpt": Truncator(" ".join(text.split())).chars(
+            POSTS_EXCERPT_LIM),
+        "text_length": len(text),
+    }
+
+
+def render_posts(posts, batch_size=500, progress=None):
+    """Пересчитывает производные поля постов пачками bulk_update.
+
+    posts - queryset постов; годится и историческая модель из миграции.
+    Идёт по id, не держа в памяти больше одной пачки, и пишет только
+    строки, у которых что-то поменялось. Возвращает их id.
+    """
+    changed = []
+    last_pk = 0
+    seen = 0
+    total = posts.count() if progress else None
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by("pk")
+                     .only("pk", "text", *DERIVED_FIELDS)[:batch_size])
+        if not batch:
+            return changed
+        stale = []
+        for post in batch:
+            fields = derived_fields(post.text)
+            if any(getattr(post, name) != value
+                   for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(post, name, value)
+                stale.append(post)
+        posts.model._default_manager.bulk_update(stale, DERIVED_FIELDS)
+        changed += [post.pk for post in stale]
+        last_pk = batch[-1].pk
+        seen += len(batch)
+        if progress:
+            progress(seen, total)
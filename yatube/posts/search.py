@@ -0,0 +1,174 @@
+import re
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+
+FTS_TABLE = "posts_post_fts"
+SNIPPET_TOKENS = 16
+# Метки подсветки, которых не бывает в тексте: их ставит snippet(),
+# а после экранирования они заменяются на <mark>.
+MARK_OPEN = "\x02"
+MARK_CLOSE = "\x03"
+
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Триггеры держат FTS5 в синхроне с posts_post. На SQLite они пропадают,
+# когда миграция пересоздаёт таблицу (AddField, AlterField), поэтому
+# restore_triggers возвращает их после каждого migrate.
+TRIGGERS_SQL = {
+    f"{FTS_TABLE}_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END
+    """,
+    f"{FTS_TABLE}_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END
+    """,
+    f"{FTS_TABLE}_update": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF text ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END
+    """,
+}
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def restore_triggers(using="default", **kwargs):
+    """Возвращает пропавшие триггеры FTS5 и перестраивает индекс: пока
+    их не было, записи в posts_post мимо него проходили.
+
+    Приёмник post_migrate, см. PostsConfig.ready.
+    """
+    if connections[using].vendor != "sqlite":
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s "
+            "OR (type = 'trigger' AND tbl_name = 'posts_post')",
+            [FTS_TABLE])
+        existing = {name for name, in cursor.fetchall()}
+        # Индекса ещё нет (миграция не применена или откачена) или
+        # триггеры на месте.
+        if FTS_TABLE not in existing or existing.issuperset(TRIGGERS_SQL):
+            return
+        for statement in TRIGGERS_SQL.values():
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(query):
+    """Запрос пользователя в выражение MATCH без синтаксиса FTS5.
+
+    Все слова обязательны, последнее ищется как префикс.
+    """
+    terms = TERM_RE.findall(query or "")
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_OPEN, "<mark>")
+        .replace(MARK_CLOSE, "</mark>"))
+
+
+class RawSubquery(RawSQL):
+    """RawSQL без собственных скобок.
+
+    Lookup __in сам берёт правую часть в скобки, а SQLite читает
+    "IN ((SELECT ...))" как скалярный подзапрос и берёт одну строку.
+    """
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def matching_ids(query):
+    """Подзапрос id подходящих постов для фильтра pk__in."""
+    return RawSubquery(
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+        (match_expression(query),))
+
+
+class SearchResults:
+    """Ленивая выборка найденных постов по релевантности.
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator:
+    каждая страница - один запрос к FTS5 с LIMIT/OFFSET и один
+    запрос самих постов по id.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+        self.query = query
+
+    def count(self):
+        if self.match is None:
+            return 0
+        if not fts_enabled():
+            return Post.objects.filter(text__icontains=self.query).count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                (self.match,))
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else start + 1
+        return self.fetch(start, stop - start)
+
+    def fetch(self, offset, limit):
+        if self.match is None:
+            return []
+        if not fts_enabled():
+            posts = list(
+                Post.objects.for_list()
+                .filter(text__icontains=self.query)[offset:offset + limit])
+            for post in posts:
+                post.snippet = post.excerpt
+            return posts
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, '…', %s) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY rank LIMIT %s OFFSET %s",
+                (MARK_OPEN, MARK_CLOSE, SNIPPET_TOKENS, self.match,
+                 limit, offset))
+            rows = cursor.fetchall()
+
+        posts = Post.objects.for_list().in_bulk([pk for pk, _ in rows])
+        results = []
+        for pk, snippet in rows:
+            post = posts.get(pk)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
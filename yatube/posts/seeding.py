@@ -0,0 +1,99 @@
+import random
+from itertools import accumulate
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from faker import Faker
+
+from .counters import reconcile_counters
+from .models import Group, Post, User
+from .rendering import derived_fields
+
+
+SEED_BATCH_SIZE = 1000
+SEED_TEXT_POOL = 500
+SEED_UNGROUPED_SHARE = 0.2
+
+
+def skewed_weights(total, skew):
+    """Кумулятивные веса Ципфа: при skew=0 все равны, больше - круче."""
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(total)))
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def seed_data(users, groups, posts, skew=1.0, batch_size=SEED_BATCH_SIZE,
+              seed=None, progress=None):
+    """Генерирует пользователей, группы и посты пачками bulk_create.
+
+    Авторы и группы постов выбираются с распределением Ципфа
+    с показателем skew. bulk_create не шлёт сигналы, поэтому в конце
+    счётчики сверяются, а кеш сбрасывается.
+    """
+    rnd = random.Random(seed)
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    token = uuid4().hex[:6]
+    password = make_password(None)
+
+    for start, size in _batches(users, batch_size):
+        User.objects.bulk_create(
+            User(
+                username=f"{fake.user_name()}_{token}_{start + i}",
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                password=password,
+            )
+            for i in range(size)
+        )
+        if progress:
+            progress("users", start + size, users)
+
+    Group.objects.bulk_create(
+        Group(
+            title=fake.catch_phrase()[:200],
+            slug=f"group-{token}-{i}",
+            description=fake.paragraph(),
+        )
+        for i in range(groups)
+    )
+
+    author_ids = list(User.objects.filter(
+        username__contains=f"_{token}_").values_list("pk", flat=True))
+    group_ids = list(Group.objects.filter(
+        slug__startswith=f"group-{token}-").values_list("pk", flat=True))
+    if not author_ids:
+        author_ids = list(User.objects.values_list("pk", flat=True))
+    author_weights = skewed_weights(len(author_ids), skew)
+    group_weights = skewed_weights(len(group_ids), skew)
+    texts = [fake.paragraph(nb_sentences=rnd.randint(1, 12))
+             for _ in range(SEED_TEXT_POOL)]
+    rendered = {text: derived_fields(text) for text in texts}
+
+    for start, size in _batches(posts, batch_size):
+        authors = rnd.choices(author_ids, cum_weights=author_weights, k=size)
+        post_groups = (
+            rnd.choices(group_ids, cum_weights=group_weights, k=size)
+            if group_ids else [None] * size)
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                Post(
+                    text=text,
+                    author_id=author_id,
+                    group_id=(None if rnd.random() < SEED_UNGROUPED_SHARE
+                              else group_id),
+                    **rendered[text],
+                )
+                for text, author_id, group_id in zip(
+                    rnd.choices(texts, k=size), authors, post_groups)
+            )
+        if progress:
+            progress("posts", start + size, posts)
+
+    reconcile_counters()
+    cache.clear()
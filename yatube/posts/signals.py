@@ -0,0 +1,154 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .counters import bump_author_counter, bump_group_counter
+from .counts import count_key, shift_counts, shift_group_count
+from .fragment_cache import (invalidate_author_fragments,
+                             invalidate_post_fragment)
+from .lookups import authors, groups
+from .models import Group, Post, User
+from .page_cache import GLOBAL_SCOPE, invalidate_pages, invalidate_post_pages
+from .timeline import drop_post, push_post
+
+
+# Счётчики в базе двигаются в транзакции сохранения, а кеши - только
+# после её фиксации: иначе другой процесс успел бы закешировать
+# страницу или счётчик по ещё старым данным, а откат оставил бы кеш
+# сдвинутым.
+
+def _old_group_id(post):
+    """Группа поста до сохранения: из from_db или, если пост собран
+    вручную, одним запросом по первичному ключу."""
+    if hasattr(post, "_loaded_group_id"):
+        return post._loaded_group_id
+    return (Post.objects.filter(pk=post.pk)
+            .values_list("group_id", flat=True).first())
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, using, **kwargs):
+    if raw:
+        return
+    post_id = instance.pk
+    author_id = instance.author_id
+    group_id = instance.group_id
+    old_group_id = None if created else _old_group_id(instance)
+    instance._loaded_group_id = group_id
+
+    if created:
+        bump_author_counter(author_id, 1)
+        bump_group_counter(group_id, 1)
+
+        def created_on_commit():
+            shift_counts(1, group_id, author_id)
+            invalidate_post_pages(author_id, group_id)
+            push_post(post_id)
+
+        transaction.on_commit(created_on_commit, using=using)
+        return
+
+    if old_group_id != group_id:
+        bump_group_counter(old_group_id, -1)
+        bump_group_counter(group_id, 1)
+
+    def changed_on_commit():
+        if old_group_id != group_id:
+            if old_group_id is not None:
+                shift_group_count(old_group_id, -1)
+            if group_id is not None:
+                shift_group_count(group_id, 1)
+        invalidate_post_pages(author_id, group_id, old_group_id)
+        invalidate_post_fragment(post_id)
+
+    transaction.on_commit(changed_on_commit, using=using)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, using, **kwargs):
+    post_id = instance.pk
+    author_id = instance.author_id
+    group_id = instance.group_id
+    bump_author_counter(author_id, -1)
+    bump_group_counter(group_id, -1)
+
+    def deleted_on_commit():
+        shift_counts(-1, group_id, author_id)
+        invalidate_post_pages(author_id, group_id)
+        drop_post(post_id)
+
+    transaction.on_commit(deleted_on_commit, using=using)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw, using, **kwargs):
+    group_id = instance.pk
+
+    def group_saved_on_commit():
+        # Новая группа тоже сбрасывает поиск: мог быть закеширован 404.
+        groups.invalidate(group_id)
+        if not created:
+            invalidate_pages(GLOBAL_SCOPE)
+
+    transaction.on_commit(group_saved_on_commit, using=using)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, using, **kwargs):
+    group_id = instance.pk
+
+    def group_deleted_on_commit():
+        groups.invalidate(group_id)
+        cache.delete(count_key(group_id=group_id))
+        invalidate_pages(GLOBAL_SCOPE)
+
+    transaction.on_commit(group_deleted_on_commit, using=using)
+
+
+# Поля автора, которые видны на страницах и во фрагментах постов.
+USER_DISPLAY_FIELDS = ("username", "first_name", "last_name")
+
+
+def _display_names(user):
+    # __dict__, а не getattr: отложенное поле не должно догружаться.
+    return tuple(user.__dict__.get(name) for name in USER_DISPLAY_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._loaded_names = _display_names(instance)
+
+
+def _names_changed(user, update_fields):
+    if update_fields is not None and not update_fields.intersection(
+            USER_DISPLAY_FIELDS):
+        return False
+    return getattr(user, "_loaded_names", None) != _display_names(user)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, using, **kwargs):
+    # Вход обновляет только last_login, его не ждёт никакой кеш. Смена
+    # пароля или email страниц не меняет: страницы и фрагменты
+    # сбрасываются только при смене имени автора.
+    if update_fields == frozenset({"last_login"}):
+        return
+    author_id = instance.pk
+    names_changed = not created and _names_changed(instance, update_fields)
+    instance._loaded_names = _display_names(instance)
+
+    def user_saved_on_commit():
+        authors.invalidate(author_id)
+        if names_changed:
+            invalidate_pages(GLOBAL_SCOPE)
+            invalidate_author_fragments(author_id)
+
+    transaction.on_commit(user_saved_on_commit, using=using)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    author_id = instance.pk
+    transaction.on_commit(lambda: authors.invalidate(author_id), using=using)
@@ -0,0 +1,16 @@
+from django import template
+
+from posts.fragment_cache import set_fragment_versions
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_versions(context, post):
+    """Версии для ключа блока поста. На первом блоке страницы они
+    читаются сразу для всех постов page_obj."""
+    if not hasattr(post, "fragment_versions"):
+        posts = [*context.get("page_obj", ()), post]
+        set_fragment_versions(posts)
+    return post.fragment_versions
@@ -0,0 +1,22 @@
+"""Колбэки transaction.on_commit в TestCase.
+
+TestCase держит каждый тест в транзакции и откатывает её, поэтому
+колбэки сигналов (сдвиг счётчиков в кеше, сброс страниц и фрагментов)
+сами не срабатывают. Аналог captureOnCommitCallbacks(execute=True) из
+Django 3.2.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """Выполняет колбэки, добавленные внутри блока, при выходе из него."""
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
@@ -0,0 +1,180 @@
+"""Проверка бюджета SQL-запросов для всех маршрутов posts и users.
+
+Используется из TestCase (posts/tests) и через фикстуру query_budget
+(tests/fixtures/fixture_queries.py).
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+
+from core.instrumentation import record_queries
+from posts import urls as posts_urls
+from posts.counters import reconcile_counters
+from posts.models import Group, GroupSubscription, Post
+from posts.rendering import derived_fields
+from users import urls as users_urls
+
+
+DATASET_SIZES = (1, 100, 10000)
+
+# Верхняя граница запросов для авторизованного автора на холодном кеше.
+# Маршрут без бюджета - ошибка проверки, см. route_names().
+ROUTE_BUDGETS = {
+    # +1 на холодном кеше: сборка буфера ленты (posts.timeline).
+    "posts:index": 5,
+    # +1 на проверку подписки автора на группу.
+    "posts:group_list": 6,
+    "posts:profile": 5,
+    "posts:post_detail": 4,
+    "posts:post_edit": 5,
+    "posts:post_create": 3,
+    "posts:search": 2,
+    # Одна подписка: запрос id на группу плюс строки страницы.
+    "posts:feed": 5,
+    # POST: группа и одна запись подписки.
+    "posts:group_subscribe": 4,
+    "posts:group_unsubscribe": 4,
+    # Для staff: сессия, пользователь и один проход по выгрузке.
+    "posts:export_posts": 3,
+    "posts:api_index": 3,
+    "posts:api_group_list": 4,
+    "posts:api_profile": 4,
+    "posts:api_post_detail": 4,
+    "users:login": 2,
+    "users:signup": 2,
+    "users:password_reset_form": 2,
+    "users:password_reset_done": 2,
+    "users:password_change_form": 2,
+    "users:password_change_done": 2,
+    "users:password_reset_confirm": 3,
+    "users:password_reset_complete": 2,
+    "users:logout": 4,
+}
+
+# Маршруты только для POST и только для staff.
+POST_ROUTES = {"posts:group_subscribe", "posts:group_unsubscribe"}
+STAFF_ROUTES = {"posts:export_posts"}
+
+SEED_BATCH = 1000
+
+
+def route_names():
+    """Имена всех маршрутов posts и users из их URLconf."""
+    return [
+        f"{urlconf.app_name}:{pattern.name}"
+        for urlconf in (posts_urls, users_urls)
+        for pattern in urlconf.urlpatterns
+        if pattern.name
+    ]
+
+
+class QueryBudget:
+    def __init__(self, client, budgets=None, sizes=DATASET_SIZES):
+        self.client = client
+        self.budgets = dict(ROUTE_BUDGETS if budgets is None else budgets)
+        self.sizes = sizes
+        self.author = None
+        self.group = None
+
+    def seed(self, total):
+        """Догоняет число постов до total пачками bulk_create."""
+        User = get_user_model()
+        if self.author is None:
+            self.author = User.objects.create_user(username="BudgetAuthor")
+            self.group = Group.objects.create(
+                title="Budget", slug="budget", description="Budget group")
+            GroupSubscription.objects.create(user=self.author,
+                                             group=self.group)
+            self.other = User.objects.create_user(username="BudgetOther")
+            self.staff = User.objects.create_user(username="BudgetStaff",
+                                                  is_staff=True)
+
+        missing = total - Post.objects.count()
+        while missing > 0:
+            batch = min(missing, SEED_BATCH)
+            Post.objects.bulk_create(
+                Post(
+                    text=f"Пост {missing - i}",
+                    author=self.author if i % 2 else self.other,
+                    group=self.group if i % 3 else None,
+                    **derived_fields(f"Пост {missing - i}"),
+                )
+                for i in range(batch)
+            )
+            missing -= batch
+
+        # bulk_create не шлёт сигналы: выравниваем счётчики и кеш.
+        reconcile_counters()
+        cache.clear()
+
+    def urls(self):
+        post = Post.objects.filter(author=self.author).first()
+        if post is None:
+            post = Post.objects.create(text="Пост", author=self.author,
+                                       group=self.group)
+        kwargs = {
+            "posts:group_list": {"slug": self.group.slug},
+            "posts:group_subscribe": {"slug": self.group.slug},
+            "posts:group_unsubscribe": {"slug": self.group.slug},
+            "posts:profile": {"username": self.author.username},
+            "posts:post_detail": {"post_id": post.pk},
+            "posts:post_edit": {"post_id": post.pk},
+            "posts:api_group_list": {"slug": self.group.slug},
+            "posts:api_profile": {"username": self.author.username},
+            "posts:api_post_detail": {"post_id": post.pk},
+            "users:password_reset_confirm": {
+                "uidb64": "MA", "token": "set-password"},
+        }
+        return {
+            name: reverse(name, kwargs=kwargs.get(name))
+            for name in self.budgets
+        }
+
+    def measure(self):
+        """Число запросов каждого маршрута на холодном кеше."""
+        counts = {}
+        for name, url in self.urls().items():
+            self.client.force_login(
+                self.staff if name in STAFF_ROUTES else self.author)
+            cache.clear()
+            method = (self.client.post if name in POST_ROUTES
+                      else self.client.get)
+            # Откат после замера: подписка, выход и прочие записи не
+            # меняют данные для следующих маршрутов.
+            with transaction.atomic():
+                # CaptureQueriesContext тут врёт: request_started в
+                # клиенте сбрасывает connection.queries посреди замера.
+                with record_queries() as recorder:
+                    response = method(url)
+                    # Выгрузка читает базу, пока отдаётся тело.
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                transaction.set_rollback(True)
+            counts[name] = recorder.count
+        return counts
+
+    def run(self):
+        """Замеры по всем размерам данных: {размер: {маршрут: запросы}}."""
+        return {size: self.seed(size) or self.measure()
+                for size in self.sizes}
+
+    def violations(self, results):
+        problems = [f"{name}: нет бюджета" for name in route_names()
+                    if name not in self.budgets]
+        smallest = results[min(results)]
+        for size, counts in sorted(results.items()):
+            for name, count in counts.items():
+                if count > self.budgets[name]:
+                    problems.append(
+                        f"{name}: {count} запросов при {size} постах, "
+                        f"бюджет {self.budgets[name]}")
+                elif count > smallest[name]:
+                    problems.append(
+                        f"{name}: {smallest[name]} -> {count} запросов "
+                        f"при росте данных до {size} постов")
+        return problems
+
+    def check(self):
+        problems = self.violations(self.run())
+        assert not problems, "\n".join(problems)
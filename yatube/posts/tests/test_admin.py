@@ -0,0 +1,93 @@
+from functools import partial
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from core.instrumentation import record_queries
+from ..admin import PostAdmin
+from ..counts import estimated_count, post_count
+from ..models import Group, Post
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        for i in range(12):
+            Post.objects.create(
+                text=f"Тестовый текст {i}",
+                author=cls.admin,
+                group=cls.group_cats if i % 2 else None,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_estimated_count(self):
+        """Без фильтров число берётся из кеша, с фильтром - до cap."""
+        post_count()
+        with self.assertNumQueries(0):
+            self.assertEqual(estimated_count(Post.objects.all()), 12)
+        self.assertEqual(
+            estimated_count(Post.objects.filter(group=self.group_cats)), 6)
+        self.assertEqual(estimated_count(Post.objects.all(), cap=5), 12)
+        self.assertEqual(
+            estimated_count(Post.objects.exclude(group=None), cap=5), 5)
+        self.assertEqual(
+            estimated_count(Post.objects.exclude(group=None), cap=2,
+                            reach=4), 4)
+
+    def test_changelist_without_full_count(self):
+        """Список постов не считает всю таблицу и не тянет группы
+        в каждый select."""
+        url = reverse("admin:posts_post_changelist")
+        post_count()
+
+        with record_queries(origins=True) as recorder:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([
+            record.sql for record in recorder.queries
+            if "COUNT(" in record.sql and "WHERE" not in record.sql])
+        self.assertFalse(recorder.n_plus_one())
+        self.assertContains(response, "admin-autocomplete")
+        self.assertContains(response, "<option value=\"%d\" selected>Cats"
+                            % self.group_cats.pk)
+
+    def test_changelist_filtered(self):
+        """Фильтр по дате и иерархия дат работают с оценкой числа."""
+        url = reverse("admin:posts_post_changelist")
+        post = Post.objects.first()
+
+        response = self.client.get(url, {
+            "pub_date__year": post.pub_date.year,
+            "q": "текст",
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 12)
+
+    def test_pages_past_cap_reachable(self):
+        """Страницы отфильтрованного списка за cap открываются."""
+        url = reverse("admin:posts_post_changelist")
+        with mock.patch.object(PostAdmin, "list_per_page", 2), \
+                mock.patch("posts.admin.estimated_count",
+                           partial(estimated_count, cap=3)):
+            response = self.client.get(url, {"q": "текст", "p": 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cl"].result_list), 2)
+        self.assertTrue(response.context["cl"].multi_page)
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..models import Post, Group
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        for i in range(25):
+            Post.objects.create(
+                text=f"Тестовый текст {i}",
+                author=cls.user,
+                group=cls.group_cats if i % 2 else None,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_field_selection(self):
+        """?fields= ограничивает набор полей в ответе."""
+        response = self.guest_client.get(
+            reverse("posts:api_index") + "?fields=id,author")
+        results = response.json()["results"]
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(set(results[0]), {"id", "author"})
+        self.assertEqual(results[0]["author"], "TestUser1")
+
+    def test_cursor_walk(self):
+        """Курсор next обходит ленту группы без повторов."""
+        url = reverse("posts:api_group_list", kwargs={"slug": "cats"})
+        seen = []
+        data = self.guest_client.get(url + "?limit=5&fields=id").json()
+        seen += [row["id"] for row in data["results"]]
+        while data["next"]:
+            data = self.guest_client.get(
+                url + f"?limit=5&fields=id&after={data['next']}").json()
+            seen += [row["id"] for row in data["results"]]
+
+        self.assertEqual(seen, list(
+            Post.objects.filter(group=self.group_cats)
+            .values_list("id", flat=True)))
+
+    def test_post_detail(self):
+        """Деталь поста отдаёт выбранные поля или 404."""
+        post = Post.objects.first()
+        response = self.guest_client.get(reverse(
+            "posts:api_post_detail", kwargs={"post_id": post.pk})
+            + "?fields=text")
+        self.assertEqual(response.json(), {"text": post.text})
+
+        response = self.guest_client.get(reverse(
+            "posts:api_post_detail", kwargs={"post_id": 10 ** 6}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_errors(self):
+        """Неизвестное поле даёт 400, неизвестный автор — 404."""
+        response = self.guest_client.get(
+            reverse("posts:api_index") + "?fields=id,password")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["error"])
+
+        response = self.guest_client.get(
+            reverse("posts:api_profile", kwargs={"username": "nobody"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_not_modified(self):
+        """Совпавший ETag даёт 304, а набор полей входит в ETag."""
+        url = reverse("posts:api_index")
+        etag = self.guest_client.get(url)["ETag"]
+
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(
+            self.guest_client.get(url + "?fields=id")["ETag"], etag)
@@ -0,0 +1,190 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..management.commands.check_query_plans import plan_problems
+from ..models import AuthorStats, Group, ImportCheckpoint, Post, User
+
+
+class SeedPostsCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_posts(self):
+        """Команда генерирует данные и сверяет счётчики."""
+        call_command("seed_posts", users=20, groups=3, posts=500,
+                     batch_size=120, seed=1, stdout=StringIO())
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 500)
+        for group in Group.objects.annotate(total=Count("posts")):
+            with self.subTest(group=group.slug):
+                self.assertEqual(group.posts_count, group.total)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list("posts_count", flat=True)),
+            500)
+
+    def test_skew_prefers_first_author(self):
+        """При большом skew первый автор пишет большую часть постов."""
+        call_command("seed_posts", users=10, groups=0, posts=300, skew=3,
+                     seed=1, stdout=StringIO())
+
+        top = (Post.objects.values("author").annotate(total=Count("id"))
+               .order_by("-total").first())
+        self.assertGreater(top["total"], 200)
+
+
+class CheckQueryPlansCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_views_use_indexes(self):
+        """Запросы views posts обходятся без сканов и TEMP B-TREE,
+        а кеш сайта команда не очищает."""
+        call_command("seed_posts", users=5, groups=2, posts=300, seed=1,
+                     stdout=StringIO())
+        cache.set("posts:kept", 1)
+        call_command("check_query_plans", stdout=StringIO())
+        self.assertEqual(cache.get("posts:kept"), 1)
+
+    def test_plan_problems(self):
+        """Скан с WHERE и сортировка во временном дереве - проблемы."""
+        sql = "SELECT * FROM posts_post WHERE text = %s ORDER BY text"
+        plan = ["SCAN posts_post", "USE TEMP B-TREE FOR ORDER BY"]
+        self.assertEqual(plan_problems(sql, plan), plan)
+        self.assertEqual(
+            plan_problems("SELECT * FROM posts_post LIMIT 10",
+                          ["SCAN posts_post"]), [])
+
+
+class ExportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="TestUser1")
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        for i in range(5):
+            Post.objects.create(text=f"Пост {i}", author=cls.user,
+                                group=cls.group_cats if i % 2 else None)
+
+    def read(self, data):
+        return [json.loads(line)
+                for line in gzip.decompress(data).decode().splitlines()]
+
+    def test_command_exports_ndjson(self):
+        """Команда пишет gzip NDJSON с автором и группой."""
+        with tempfile.NamedTemporaryFile(suffix=".gz") as output:
+            call_command("export_posts", output=output.name, group="cats",
+                         stderr=StringIO())
+            rows = self.read(output.read())
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["author"], "TestUser1")
+        self.assertEqual(rows[0]["group"], "cats")
+        self.assertEqual(rows[0]["text"], "Пост 1")
+
+    def test_view_streams_for_staff(self):
+        """Выгрузка отдаётся потоком и только персоналу."""
+        url = reverse("posts:export_posts")
+        self.assertEqual(Client().get(url).status_code, 302)
+
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            url, {"author": "TestUser1", "from": "2000-01-01"})
+        self.assertTrue(response.streaming)
+        rows = self.read(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 5)
+
+        response = client.get(url, {"from": "вчера"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        rows = [
+            {"text": "Пост 1", "author": "TestUser1", "group": "cats",
+             "pub_date": "2020-01-02T03:04:05+00:00"},
+            {"text": "Пост 2", "author": "nobody"},
+            {"text": "   ", "author": "TestUser1"},
+            {"text": "Пост 4", "author": "TestUser1"},
+            {"text": "Пост 5", "author": "TestUser1", "group": "cats"},
+            {"text": "Пост 6", "author": "TestUser1",
+             "pub_date": "2020-13-01T00:00:00"},
+        ]
+        self.file = tempfile.NamedTemporaryFile(
+            "w", suffix=".ndjson", encoding="utf-8")
+        self.file.write("\n".join(json.dumps(row) for row in rows))
+        self.file.flush()
+
+    def tearDown(self):
+        self.file.close()
+
+    def run_import(self):
+        out = StringIO()
+        call_command("import_posts", self.file.name, batch_size=2,
+                     stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_import_validates_and_counts(self):
+        """Импорт отклоняет плохие строки и двигает счётчики."""
+        out = self.run_import()
+
+        self.assertIn("Импортировано 3, отклонено 3", out)
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(
+            Post.objects.get(text="Пост 1").pub_date.year, 2020)
+        self.assertGreater(
+            Post.objects.get(text="Пост 4").pub_date.year, 2020)
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 3)
+        self.group_cats.refresh_from_db()
+        self.assertEqual(self.group_cats.posts_count, 2)
+
+    def test_import_rejects_malformed_rows(self):
+        """Битый JSON и строки не-объекты отклоняются, а не роняют
+        импорт."""
+        self.file.write('\n{"text": "Пост 7",\n["x"]\n'
+                        '{"text": "Пост 9", "author": ["TestUser1"]}\n'
+                        '{"text": "Пост 10", "author": "TestUser1", '
+                        '"pub_date": 10}\n')
+        self.file.flush()
+
+        self.assertIn("Импортировано 3, отклонено 7", self.run_import())
+        self.assertIn("Импортировано 0", self.run_import())
+
+    def test_import_resumes(self):
+        """Повторный запуск пропускает уже обработанные строки."""
+        self.run_import()
+        self.assertIn("Импортировано 0", self.run_import())
+        self.assertEqual(Post.objects.count(), 3)
+
+        ImportCheckpoint.objects.update(position=3)
+        Post.objects.filter(text__in=("Пост 4", "Пост 5")).delete()
+        self.run_import()
+        self.assertEqual(Post.objects.count(), 3)
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..models import Post, Group
+from .on_commit import run_on_commit
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text="Тестовый текст",
+            author=self.user,
+            group=self.group_cats,
+        )
+        self.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": "cats"}),
+            reverse("posts:profile", kwargs={"username": "TestUser1"}),
+        )
+
+    def test_not_modified_without_rendering(self):
+        """Совпавший ETag даёт 304 без шаблонов."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)["ETag"]
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+
+    def test_change_refreshes_validators(self):
+        """Правка поста меняет ETag зависящих от него страниц."""
+        etags = {url: self.guest_client.get(url)["ETag"] for url in self.urls}
+
+        with run_on_commit():
+            self.post.text = "Новый текст"
+            self.post.save()
+
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_post_detail_not_conditional(self):
+        """Страница поста со счётчиком просмотров всегда рендерится."""
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+        response = self.guest_client.get(url)
+        self.assertNotIn("ETag", response)
+
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_number_in_etag(self):
+        """Разные страницы списка имеют разные ETag."""
+        self.assertNotEqual(
+            self.guest_client.get(self.urls[0])["ETag"],
+            self.guest_client.get(self.urls[0] + "?page=2")["ETag"])
+
+    def test_head_without_body(self):
+        """HEAD отвечается заголовками, несуществующий объект - 404."""
+        response = self.guest_client.head(self.urls[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        self.assertFalse(response.templates)
+
+        response = self.guest_client.head(
+            reverse("posts:group_list", kwargs={"slug": "nope"}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,155 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..counts import count_key, post_count
+from ..models import AuthorStats, Post, Group
+from .on_commit import run_on_commit
+
+
+class PostCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        cls.group_dogs = Group.objects.create(
+            title="Dogs",
+            slug="dogs",
+            description="Dogs group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            Post.objects.create(
+                text="Тестовый текст",
+                author=self.user,
+                group=self.group_cats,
+            )
+
+    def test_miss_falls_back_to_count(self):
+        """При промахе счётчик считается запросом и кладётся в кеш."""
+        with self.assertNumQueries(1):
+            self.assertEqual(post_count(group=self.group_cats), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(post_count(group=self.group_cats), 3)
+        self.assertEqual(cache.get(count_key(group_id=self.group_cats.pk)),
+                         3)
+
+    def test_signals_keep_counts(self):
+        """Создание, смена группы и удаление сдвигают счётчики."""
+        post_count()
+        post_count(group=self.group_cats)
+        post_count(group=self.group_dogs)
+        post_count(author=self.user)
+
+        with run_on_commit():
+            post = Post.objects.create(text="Ещё", author=self.user)
+            post.group = self.group_dogs
+            post.save()
+            Post.objects.filter(group=self.group_cats).first().delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(post_count(), 3)
+            self.assertEqual(post_count(group=self.group_cats), 2)
+            self.assertEqual(post_count(group=self.group_dogs), 1)
+            self.assertEqual(post_count(author=self.user), 3)
+
+    def test_rollback_keeps_cached_counts(self):
+        """Откаченное создание поста не сдвигает счётчики в кеше."""
+        post_count()
+        with run_on_commit(), self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(text="Откат", author=self.user)
+                raise RuntimeError
+        self.assertEqual(cache.get(count_key()), 3)
+
+    def test_edit_without_extra_select(self):
+        """Правка прочитанного поста без смены группы - один UPDATE."""
+        post = Post.objects.get(pk=Post.objects.first().pk)
+        post.text = "Правка"
+        with self.assertNumQueries(1):
+            post.save()
+
+
+class StoredCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        cls.group_dogs = Group.objects.create(
+            title="Dogs",
+            slug="dogs",
+            description="Dogs group"
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertCounters(self, author, cats, dogs):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, author)
+        self.group_cats.refresh_from_db()
+        self.group_dogs.refresh_from_db()
+        self.assertEqual(self.group_cats.posts_count, cats)
+        self.assertEqual(self.group_dogs.posts_count, dogs)
+
+    def test_views_keep_counters(self):
+        """Создание, правка и удаление поддерживают счётчики."""
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Тестовый текст", "group": self.group_cats.id})
+        post = Post.objects.get()
+        self.assertCounters(1, 1, 0)
+
+        self.authorized_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": post.id}),
+            data={"text": "Тестовый текст", "group": self.group_dogs.id})
+        self.assertCounters(1, 0, 1)
+
+        post.refresh_from_db()
+        post.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_profile_reads_counter(self):
+        """Профиль показывает хранимый счётчик без агрегата."""
+        Post.objects.create(text="Тестовый текст", author=self.user)
+        AuthorStats.objects.filter(author=self.user).update(posts_count=7)
+
+        response = self.authorized_client.get(
+            reverse("posts:profile", kwargs={"username": "TestUser1"}))
+        self.assertContains(response, "Всего постов: 7")
+
+    def test_reconcile_command(self):
+        """Команда сверки приводит счётчики к реальным данным."""
+        Post.objects.create(text="Тестовый текст", author=self.user,
+                            group=self.group_cats)
+        AuthorStats.objects.filter(author=self.user).update(posts_count=5)
+        Group.objects.filter(pk=self.group_dogs.pk).update(posts_count=3)
+
+        post_count(author=self.user)
+        post_count(group=self.group_dogs)
+
+        with run_on_commit():
+            call_command("reconcile_post_counters", stdout=StringIO())
+
+        self.assertCounters(1, 1, 0)
+        self.assertEqual(post_count(author=self.user), 1)
+        self.assertEqual(post_count(group=self.group_dogs), 0)
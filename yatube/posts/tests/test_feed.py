@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..feed import feed_page, merge_streams
+from ..models import Group, GroupSubscription, Post
+
+
+class SubscriptionFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.groups = [
+            Group.objects.create(title=f"Group {i}", slug=f"group-{i}",
+                                 description="Group")
+            for i in range(4)
+        ]
+        for i in range(30):
+            Post.objects.create(
+                text=f"Пост {i}",
+                author=cls.user,
+                group=cls.groups[i * 7 % 4] if i % 5 else None,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_merge_streams(self):
+        """Куча сливает убывающие потоки в один убывающий."""
+        self.assertEqual(
+            merge_streams([[9, 4, 1], [8, 7], [], [5, 3, 2]], 5),
+            [9, 8, 7, 5, 4])
+
+    def test_pages_match_naive_feed(self):
+        """Курсорные страницы вперёд и назад совпадают с group__in."""
+        group_ids = [group.pk for group in self.groups[:3]]
+        expected = list(Post.objects.filter(group__in=group_ids)
+                        .values_list("id", flat=True))
+
+        page = feed_page(group_ids, 5)
+        pages = [[post.pk for post in page]]
+        while page.has_next():
+            page = feed_page(group_ids, 5, after=page.next_cursor)
+            pages.append([post.pk for post in page])
+        self.assertEqual(sum(pages, []), expected)
+
+        page = feed_page(group_ids, 5, before=page.previous_cursor)
+        self.assertEqual([post.pk for post in page], pages[-2])
+
+    def test_subscribe_and_read_feed(self):
+        """Подписка из страницы группы добавляет её посты в ленту."""
+        response = self.authorized_client.get(reverse("posts:feed"))
+        self.assertFalse(response.context["has_subscriptions"])
+
+        group = self.groups[1]
+        url = reverse("posts:group_list", kwargs={"slug": group.slug})
+        etag = self.authorized_client.get(url)["ETag"]
+        guest_etag = Client().get(url)["ETag"]
+        self.authorized_client.post(
+            reverse("posts:group_subscribe", kwargs={"slug": group.slug}))
+        self.assertTrue(GroupSubscription.objects.filter(
+            user=self.user, group=group).exists())
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Отписаться")
+        # Страница группы для остальных не изменилась.
+        response = Client().get(url, HTTP_IF_NONE_MATCH=guest_etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.authorized_client.get(reverse("posts:feed"))
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            list(Post.objects.filter(group=group)
+                 .values_list("id", flat=True)[:10]))
+
+        self.authorized_client.post(
+            reverse("posts:group_unsubscribe", kwargs={"slug": group.slug}))
+        self.assertFalse(GroupSubscription.objects.exists())
+
+    def test_new_csrf_cookie_refreshes_group_page(self):
+        """С новым CSRF-cookie страница с формой подписки рендерится
+        заново, а не отдаётся 304 со старым токеном."""
+        url = reverse("posts:group_list", kwargs={"slug": "group-0"})
+        # Первый ответ выдаёт cookie, ETag берём уже с ним.
+        self.authorized_client.get(url)
+        etag = self.authorized_client.get(url)["ETag"]
+        self.assertEqual(
+            self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.authorized_client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 64
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_feed_requires_login(self):
+        """Лента и подписка только для авторизованных, подписка - POST."""
+        response = Client().get(reverse("posts:feed"))
+        self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.get(
+            reverse("posts:group_subscribe", kwargs={"slug": "group-0"}))
+        self.assertEqual(response.status_code, 405)
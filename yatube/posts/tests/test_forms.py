@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -12,6 +13,7 @@ class PostsFormTests(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
+        cache.clear()
         cls.User_mod = get_user_model()
         cls.user = cls.User_mod.objects.create_user(username="TestUser1")
 
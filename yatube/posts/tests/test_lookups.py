@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..lookups import MISSING, LRUCache, authors, groups
+from ..models import Group
+from ..versions import scope_versions
+from .on_commit import run_on_commit
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recent(self):
+        """Сверх maxsize вытесняется давно не читанная запись."""
+        lru = LRUCache(2, 60, 10)
+        lru.set("a", 1, "v")
+        lru.set("b", 2, "v")
+        lru.get("a", "v")
+        lru.set("c", 3, "v")
+
+        self.assertIs(lru.get("b", "v"), MISSING)
+        self.assertEqual(lru.get("a", "v"), 1)
+        self.assertEqual(lru.get("c", "v"), 3)
+
+    def test_ttl_and_version(self):
+        """Запись пропадает по TTL, промах живёт меньше, чужая версия
+        не подходит."""
+        lru = LRUCache(10, 60, 10)
+        with mock.patch("posts.lookups.time.monotonic", return_value=0):
+            lru.set("hit", 1, "v")
+            lru.set("miss", None, "v")
+            self.assertIs(lru.get("hit", "other"), MISSING)
+            lru.set("hit", 1, "v")
+        with mock.patch("posts.lookups.time.monotonic", return_value=30):
+            self.assertEqual(lru.get("hit", "v"), 1)
+            self.assertIs(lru.get("miss", "v"), MISSING)
+        with mock.patch("posts.lookups.time.monotonic", return_value=61):
+            self.assertIs(lru.get("hit", "v"), MISSING)
+
+
+class LookupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_repeat_lookup_without_queries(self):
+        """Повторный поиск группы и автора не ходит в базу."""
+        self.assertEqual(groups.get_or_404("cats"), self.group_cats)
+        self.assertEqual(authors.get_or_404("TestUser1"), self.user)
+
+        with self.assertNumQueries(0):
+            group = groups.get_or_404("cats")
+            authors.get_or_404("TestUser1")
+        self.assertEqual(group.title, "Cats")
+        self.assertIsNot(group, groups.get("cats"))
+
+    def test_not_found_is_cached(self):
+        """Несуществующий slug отвечает 404 без повторных запросов."""
+        for url in (reverse("posts:group_list", kwargs={"slug": "nope"}),
+                    reverse("posts:profile", kwargs={"username": "nobody"})):
+            self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(groups.exists("nope"))
+            self.assertFalse(authors.exists("nobody"))
+
+    def test_signals_invalidate(self):
+        """Создание и правка группы или автора сбрасывают записи."""
+        self.assertIsNone(groups.get("dogs"))
+        with run_on_commit():
+            Group.objects.create(title="Dogs", slug="dogs",
+                                 description="Dogs")
+        self.assertEqual(groups.get("dogs").title, "Dogs")
+
+        groups.get("cats")
+        with run_on_commit():
+            self.group_cats.title = "Коты"
+            self.group_cats.save()
+        self.assertEqual(groups.get("cats").title, "Коты")
+
+        self.assertIsNone(authors.get("NewUser"))
+        with run_on_commit():
+            get_user_model().objects.create_user(username="NewUser")
+        self.assertIsNotNone(authors.get("NewUser"))
+
+        with run_on_commit():
+            self.user.first_name = "Иван"
+            self.user.save()
+        self.assertEqual(authors.get("TestUser1").first_name, "Иван")
+
+    def test_save_keeps_other_entries(self):
+        """Правка автора не сбрасывает записи других авторов, а старый
+        username после переименования больше не находится."""
+        with run_on_commit():
+            get_user_model().objects.create_user(username="Other")
+        authors.get("Other")
+        authors.get("TestUser1")
+
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with run_on_commit():
+            user.username = "Renamed"
+            user.save()
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(authors.get("Other"))
+        self.assertIsNone(authors.get("TestUser1"))
+        self.assertEqual(authors.get("Renamed"), user)
+
+    def test_version_read_once_per_request(self):
+        """Страница группы читает токен версии группы один раз, хотя
+        ищет её и для ETag, и для кеша страницы, и во view."""
+        url = reverse("posts:group_list", kwargs={"slug": "cats"})
+        with mock.patch("posts.lookups.scope_versions",
+                        wraps=scope_versions) as versions:
+            self.assertEqual(self.guest_client.get(url).status_code, 200)
+        self.assertEqual(versions.call_count, 1)
@@ -0,0 +1,184 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..models import Post, Group
+from .on_commit import run_on_commit
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        cls.group_dogs = Group.objects.create(
+            title="Dogs",
+            slug="dogs",
+            description="Dogs group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text="Первый текст",
+            author=self.user,
+            group=self.group_cats,
+        )
+        self.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": "cats"}),
+            reverse("posts:profile", kwargs={"username": "TestUser1"}),
+        )
+
+    def test_anonymous_pages_served_from_cache(self):
+        """Повторный анонимный запрос списка не ходит в базу."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованному пользователю страница рендерится заново."""
+        self.guest_client.get(self.urls[0])
+        response = self.authorized_client.get(self.urls[0])
+        self.assertContains(response, "Пользователь: TestUser1")
+
+    def test_post_change_invalidates_pages(self):
+        """Правка поста сбрасывает страницы, где пост был виден."""
+        for url in self.urls:
+            self.guest_client.get(url)
+
+        with run_on_commit():
+            self.post.text = "Новый текст"
+            self.post.group = self.group_dogs
+            self.post.save()
+
+        for url in self.urls[::2]:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), "Новый текст")
+        self.assertNotContains(self.guest_client.get(self.urls[1]),
+                               "Новый текст")
+
+    def test_group_rename_invalidates_pages(self):
+        """Переименование группы сбрасывает все страницы списков."""
+        self.guest_client.get(self.urls[0])
+
+        with run_on_commit():
+            self.group_cats.title = "Котики"
+            self.group_cats.save()
+
+        self.assertContains(self.guest_client.get(self.urls[0]), "Котики")
+
+    def test_user_save_invalidates_only_on_rename(self):
+        """Смена пароля или email не сбрасывает страницы, смена имени -
+        сбрасывает."""
+        user = get_user_model().objects.get(pk=self.user.pk)
+        self.guest_client.get(self.urls[0])
+
+        with run_on_commit():
+            user.set_password("new-password")
+            user.email = "user@example.com"
+            user.save()
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.urls[0])
+
+        with run_on_commit():
+            user.first_name = "Иван"
+            user.last_name = "Петров"
+            user.save(update_fields=("first_name", "last_name"))
+        self.assertContains(self.guest_client.get(self.urls[0]),
+                            "Иван Петров")
+
+    def test_garbage_params_share_entry(self):
+        """Мусорные page и курсоры попадают в ключ уже разобранными."""
+        url = self.urls[0]
+        self.guest_client.get(url)
+        for params in ({"page": "zzz1"}, {"page": "1"}, {"page": ""}):
+            with self.subTest(params=params):
+                with self.assertNumQueries(0):
+                    self.guest_client.get(url, params)
+
+        self.guest_client.get(url, {"after": "garbage"})
+        with self.assertNumQueries(0):
+            self.guest_client.get(url, {"after": "other-garbage"})
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text="Первый текст",
+            author=self.user,
+            group=self.group_cats,
+        )
+
+    def test_post_block_reused_until_edit(self):
+        """Блок поста берётся из кеша, пока пост не изменён."""
+        url = reverse("posts:profile", kwargs={"username": "TestUser1"})
+        self.authorized_client.get(reverse("posts:index"))
+
+        Post.objects.filter(pk=self.post.pk).update(text="Тихая правка")
+        self.assertContains(self.authorized_client.get(url), "Первый текст")
+
+        with run_on_commit():
+            self.post.text = "Новый текст"
+            self.post.save()
+        self.assertContains(self.authorized_client.get(url), "Новый текст")
+
+    def test_block_shared_between_pages(self):
+        """Блок поста один на все списки, ссылка на группу - вне его."""
+        self.authorized_client.get(reverse("posts:index"))
+        Post.objects.filter(pk=self.post.pk).update(excerpt="Тихая правка")
+
+        response = self.authorized_client.get(
+            reverse("posts:group_list", kwargs={"slug": "cats"}))
+        self.assertContains(response, "Первый текст")
+        self.assertNotContains(response, "все записи")
+
+    def test_versions_read_once_per_page(self):
+        """Версии блоков страницы читаются из кеша одним get_many."""
+        for i in range(3):
+            Post.objects.create(text=f"Пост {i}", author=self.user)
+        with mock.patch.object(cache, "get_many",
+                               wraps=cache.get_many) as get_many:
+            self.authorized_client.get(reverse("posts:index"))
+        calls = [call for call in get_many.call_args_list
+                 if any("fragment:" in key for key in call[0][0])]
+        self.assertEqual(len(calls), 1)
+
+    def test_group_rename_refreshes_blocks(self):
+        """Переименование группы обновляет блоки её постов."""
+        self.authorized_client.get(reverse("posts:index"))
+
+        with run_on_commit():
+            self.group_cats.title = "Котики"
+            self.group_cats.save()
+
+        self.assertContains(
+            self.authorized_client.get(reverse("posts:index")),
+            "группы Котики")
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..counts import post_count
+from ..models import AuthorStats, Group, Post
+from ..search import SearchResults
+
+User = get_user_model()
+
+
+class PurgeAuthorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keeper = User.objects.create_user(username="Keeper")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.spammer = User.objects.create_user(username="Spammer")
+        for i in range(7):
+            Post.objects.create(
+                text=f"Спам {i}",
+                author=self.spammer,
+                group=self.group_cats if i % 2 else None,
+            )
+        Post.objects.create(text="Котики", author=self.keeper,
+                            group=self.group_cats)
+
+    def test_dry_run_changes_nothing(self):
+        """--dry-run показывает план и ничего не удаляет."""
+        out = StringIO()
+        call_command("purge_author", "Spammer", "--dry-run", stdout=out)
+
+        self.assertIn("Spammer: постов 7", out.getvalue())
+        self.assertIn("cats: 3", out.getvalue())
+        self.assertEqual(Post.objects.filter(author=self.spammer).count(), 7)
+
+    def test_purge_keeps_counters_and_caches(self):
+        """Пачечное удаление сдвигает счётчики и сбрасывает кеши."""
+        self.assertEqual(post_count(), 8)
+        self.assertEqual(post_count(group=self.group_cats), 4)
+        self.assertContains(self.guest_client.get(
+            reverse("posts:group_list", kwargs={"slug": "cats"})), "Спам")
+
+        call_command("purge_author", "Spammer", "--batch-size", "3",
+                     stdout=StringIO())
+
+        self.assertFalse(User.objects.filter(username="Spammer").exists())
+        self.assertEqual(list(Post.objects.values_list("text", flat=True)),
+                         ["Котики"])
+        self.group_cats.refresh_from_db()
+        self.assertEqual(self.group_cats.posts_count, 1)
+        self.assertEqual(post_count(), 1)
+        self.assertEqual(post_count(group=self.group_cats), 1)
+        self.assertNotContains(self.guest_client.get(
+            reverse("posts:group_list", kwargs={"slug": "cats"})), "Спам")
+        self.assertEqual(self.guest_client.get(
+            reverse("posts:profile", kwargs={"username": "Spammer"})
+        ).status_code, 404)
+        self.assertEqual(SearchResults("Спам").count(), 0)
+
+    def test_keep_user(self):
+        """--keep-user удаляет только посты."""
+        call_command("purge_author", "Spammer", "--keep-user",
+                     stdout=StringIO())
+
+        self.assertTrue(User.objects.filter(username="Spammer").exists())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.spammer).posts_count, 0)
+
+    def test_admin_action(self):
+        """Действие админки удаляет выбранных пользователей с постами."""
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+        client = Client()
+        client.force_login(admin)
+
+        response = client.post(
+            reverse("admin:auth_user_changelist"),
+            {"action": "purge", "_selected_action": [self.spammer.pk]},
+            follow=True)
+
+        self.assertContains(response, "постов: 7")
+        self.assertEqual(Post.objects.count(), 1)
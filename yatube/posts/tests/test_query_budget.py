@@ -0,0 +1,17 @@
+from django.test import TestCase, Client
+
+from .query_budget import ROUTE_BUDGETS, QueryBudget
+
+
+class QueryBudgetTests(TestCase):
+    def test_routes_stay_within_budget(self):
+        """Число запросов маршрутов в бюджете и не растёт с данными."""
+        QueryBudget(Client()).check()
+
+    def test_route_without_budget_reported(self):
+        """Маршрут из URLconf без бюджета - ошибка проверки."""
+        budgets = dict(ROUTE_BUDGETS)
+        del budgets["posts:group_subscribe"]
+        self.assertEqual(
+            QueryBudget(Client(), budgets).violations({1: {}}),
+            ["posts:group_subscribe: нет бюджета"])
@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from core.instrumentation import record_queries
+from ..counts import post_count
+from ..models import Group, Post
+from ..regrouping import regroup_posts
+
+
+class RegroupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group_cats = Group.objects.create(
+            title="Cats",
+            slug="cats",
+            description="Cats group"
+        )
+        cls.group_dogs = Group.objects.create(
+            title="Dogs",
+            slug="dogs",
+            description="Dogs group"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        for i in range(5):
+            Post.objects.create(text=f"Кот {i}", author=self.user,
+                                group=self.group_cats)
+        Post.objects.create(text="Пёс", author=self.user,
+                            group=self.group_dogs)
+        Post.objects.create(text="Без группы", author=self.user)
+
+    def assertGroupCounts(self, cats, dogs):
+        for group, expected in ((self.group_cats, cats),
+                                (self.group_dogs, dogs)):
+            group.refresh_from_db()
+            self.assertEqual(group.posts_count, expected)
+            self.assertEqual(post_count(group=group), expected)
+
+    def test_merge_groups(self):
+        """Слияние групп: пачки UPDATE, счётчики и страницы в порядке."""
+        self.assertGroupCounts(5, 1)
+        self.assertNotContains(self.guest_client.get(
+            reverse("posts:group_list", kwargs={"slug": "dogs"})), "Кот 0")
+
+        with record_queries() as recorder:
+            moved = regroup_posts(Post.objects.filter(group=self.group_cats),
+                                  self.group_dogs, batch_size=2)
+
+        self.assertEqual(moved, 5)
+        self.assertEqual(len([
+            record for record in recorder.queries
+            if record.sql.startswith('UPDATE "posts_post"')]), 3)
+        self.assertGroupCounts(0, 6)
+        self.assertContains(self.guest_client.get(
+            reverse("posts:group_list", kwargs={"slug": "dogs"})), "Кот 0")
+
+    def test_clear_command(self):
+        """Команда убирает группу и сообщает число постов, --dry-run
+        только считает."""
+        out = StringIO()
+        call_command("regroup_posts", "--clear", "--dry-run", stdout=out)
+        self.assertIn("Будет затронуто постов: 6", out.getvalue())
+        self.assertGroupCounts(5, 1)
+
+        out = StringIO()
+        call_command("regroup_posts", "--clear", "--from", "cats",
+                     stdout=out)
+        self.assertIn("Перенесено постов: 5", out.getvalue())
+        self.assertGroupCounts(0, 1)
+        self.assertEqual(Post.objects.filter(group=None).count(), 6)
+
+    def test_admin_actions(self):
+        """Действия админки переносят выбранные посты одним UPDATE."""
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+        client = Client()
+        client.force_login(admin)
+        url = reverse("admin:posts_post_changelist")
+        selected = list(Post.objects.filter(group=self.group_cats)
+                        .values_list("pk", flat=True)[:3])
+
+        response = client.post(url, {
+            "action": "move_to_group",
+            "group": self.group_dogs.pk,
+            "_selected_action": selected,
+        }, follow=True)
+        self.assertContains(response, "Перенесено в группу Dogs: 3 постов")
+        self.assertGroupCounts(2, 4)
+
+        response = client.post(url, {
+            "action": "clear_group",
+            "_selected_action": selected,
+        }, follow=True)
+        self.assertContains(response, "Группа убрана у 3 постов")
+        self.assertGroupCounts(2, 1)
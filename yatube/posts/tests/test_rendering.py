@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..constants import POSTS_EXCERPT_LIM
+from ..models import Post
+
+
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_save_renders_text(self):
+        """save() хранит HTML, анонс в одну строку и длину текста."""
+        post = Post.objects.create(text="<b>Коты</b>\nи собаки",
+                                   author=self.user)
+
+        self.assertEqual(post.text_html, "&lt;b&gt;Коты&lt;/b&gt;<br>и собаки")
+        self.assertEqual(post.excerpt, "<b>Коты</b> и собаки")
+        self.assertEqual(post.text_length, 20)
+        self.assertFalse(post.is_truncated)
+
+        post.text = "слово " * POSTS_EXCERPT_LIM
+        post.save(update_fields=("text",))
+        post.refresh_from_db()
+        self.assertEqual(len(post.excerpt), POSTS_EXCERPT_LIM)
+        self.assertTrue(post.is_truncated)
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, "читать полностью")
+
+    def test_form_edit_renders_text(self):
+        """Правка через PostForm пересчитывает производные поля."""
+        post = Post.objects.create(text="Старый текст", author=self.user)
+        self.authorized_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": post.pk}),
+            data={"text": "Новый\nтекст"})
+
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, "Новый<br>текст")
+        self.assertContains(
+            self.authorized_client.get(
+                reverse("posts:post_detail", kwargs={"post_id": post.pk})),
+            "Новый<br>текст")
+
+    def test_lists_defer_text(self):
+        """Списки не тянут полный текст поста."""
+        Post.objects.create(text="Тестовый текст", author=self.user)
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:profile", kwargs={"username": "TestUser1"}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                post = response.context["page_obj"].object_list[0]
+                self.assertIn("text", post.get_deferred_fields())
+                self.assertContains(response, "Тестовый текст")
+
+    def test_render_command(self):
+        """Команда дописывает производные поля постам, вставленным
+        в обход save()."""
+        Post.objects.bulk_create([
+            Post(text="Пост из bulk_create", author=self.user)])
+        Post.objects.create(text="Обычный пост", author=self.user)
+        out = StringIO()
+
+        call_command("render_post_texts", stdout=out)
+
+        self.assertIn("Обновлено постов: 1", out.getvalue())
+        self.assertEqual(Post.objects.get(text="Пост из bulk_create").excerpt,
+                         "Пост из bulk_create")
+
+    def test_list_columns(self):
+        """for_list() не выбирает текст поста и лишние колонки автора."""
+        sql = str(Post.objects.for_list().query)
+
+        for column in ('"posts_post"."text"', "text_html", "password",
+                       "email", "description"):
+            with self.subTest(column=column):
+                self.assertNotIn(column, sql)
+        self.assertIn('"posts_post"."excerpt"', sql)
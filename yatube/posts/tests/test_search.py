@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post
+from ..search import SearchResults, match_expression
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.cats = Post.objects.create(
+            text="Коты <b>любят</b> спать. Коты и кошки.",
+            author=cls.user,
+        )
+        cls.dogs = Post.objects.create(
+            text="Собаки любят гулять, а коты нет.",
+            author=cls.user,
+        )
+        for i in range(12):
+            Post.objects.create(text=f"Попугай номер {i}", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.superuser = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+
+    def test_match_expression(self):
+        """Пользовательский ввод не ломает синтаксис FTS5."""
+        self.assertEqual(match_expression('кот "OR'), '"кот" "OR"*')
+        self.assertIsNone(match_expression("  ?! "))
+
+    def test_ranked_results_with_snippet(self):
+        """Результаты ранжированы, подсветка экранирует текст поста."""
+        results = SearchResults("коты")
+
+        self.assertEqual(results.count(), 2)
+        top = results[0:2]
+        self.assertEqual([post.pk for post in top],
+                         [self.cats.pk, self.dogs.pk])
+        self.assertIn("<mark>Коты</mark>", top[0].snippet)
+        self.assertIn("&lt;b&gt;", top[0].snippet)
+
+    def test_index_follows_edits(self):
+        """Правка и удаление поста обновляют индекс."""
+        dogs = Post.objects.get(pk=self.dogs.pk)
+        dogs.text = "Собаки любят гулять"
+        dogs.save()
+        self.assertEqual(SearchResults("коты").count(), 1)
+
+        Post.objects.get(pk=self.cats.pk).delete()
+        self.assertEqual(SearchResults("коты").count(), 0)
+
+    def test_search_view_paginates(self):
+        """Страница поиска листается с сохранением запроса."""
+        response = self.guest_client.get(
+            reverse("posts:search") + "?q=попугай")
+
+        self.assertEqual(response.context["page_obj"].paginator.count, 12)
+        self.assertEqual(len(response.context["page_obj"]), 10)
+        self.assertContains(response, "?q=%D0%BF")
+
+    def test_search_ignores_cursor_params(self):
+        """Курсоры after и before на странице поиска не ломают её."""
+        for param in ("after", "before"):
+            response = self.guest_client.get(
+                reverse("posts:search"), {"q": "попугай", param: "MTA"})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["page_obj"]), 10)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты через FTS5."""
+        client = Client()
+        client.force_login(self.superuser)
+        response = client.get(
+            reverse("admin:posts_post_changelist") + "?q=собаки")
+
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+    def test_admin_search_returns_every_match(self):
+        """Поиск в админке отдаёт все совпадения, а не первое."""
+        client = Client()
+        client.force_login(self.superuser)
+        response = client.get(
+            reverse("admin:posts_post_changelist") + "?q=коты")
+
+        self.assertEqual(
+            {post.pk for post in response.context["cl"].result_list},
+            {self.cats.pk, self.dogs.pk})
+
+    def test_migrate_restores_triggers(self):
+        """После migrate пропавшие триггеры возвращаются, а записи,
+        прошедшие мимо индекса, в него попадают."""
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER posts_post_fts_insert")
+        Post.objects.create(text="Хомяк без индекса", author=self.user)
+        self.assertEqual(SearchResults("хомяк").count(), 0)
+
+        emit_post_migrate_signal(0, False, "default")
+        self.assertEqual(SearchResults("хомяк").count(), 1)
+        Post.objects.create(text="Хомяк с индексом", author=self.user)
+        self.assertEqual(SearchResults("хомяк").count(), 2)
+
+    def test_rebuild_command(self):
+        """Команда перестраивает индекс по таблице постов."""
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("14", out.getvalue())
@@ -0,0 +1,127 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client, RequestFactory
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from core.instrumentation import record_queries
+from ..counts import post_count
+from ..models import Group, Post
+from ..purging import _delete_rows
+from ..timeline import (TIMELINE_KEY, TIMELINE_LOCK_KEY, forget_timeline,
+                        rebuild_timeline, timeline, timeline_page)
+from ..utils import encode_cursor
+from .on_commit import run_on_commit
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+        cls.group = Group.objects.create(title="Group", slug="group",
+                                         description="Group")
+        for i in range(25):
+            Post.objects.create(text=f"Пост {i}", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def page_ids(self, size=None, **params):
+        if size is not None:
+            rebuild_timeline(size)
+        request = self.factory.get("/", params)
+        page = timeline_page(Post.objects.for_list(), 10, request, post_count)
+        return page, [post.pk for post in page]
+
+    def expected(self, start, stop):
+        return list(Post.objects.values_list("id", flat=True)[start:stop])
+
+    def test_pages_inside_buffer_skip_order_by(self):
+        """Страница из буфера - один запрос id IN без ORDER BY."""
+        timeline()
+        post_count()
+        with record_queries() as recorder:
+            _, ids = self.page_ids(page=2)
+        self.assertEqual(ids, self.expected(10, 20))
+        self.assertEqual(recorder.count, 1)
+        self.assertNotIn("ORDER BY", recorder.queries[0].sql)
+
+    def test_fallback_past_window(self):
+        """За окном буфера страницы по номеру и курсору идут в базу."""
+        page, ids = self.page_ids(size=15, page=2)
+        self.assertEqual(ids, self.expected(10, 20))
+        self.assertEqual(page.paginator.num_pages, 3)
+
+        _, first = self.page_ids()
+        page, ids = self.page_ids(after=encode_cursor(first[-1]))
+        self.assertEqual(ids, self.expected(10, 20))
+        page, ids = self.page_ids(after=page.next_cursor)
+        self.assertEqual(ids, self.expected(20, 25))
+        self.assertFalse(page.has_next())
+
+        page, ids = self.page_ids(before=page.previous_cursor)
+        self.assertEqual(ids, self.expected(10, 20))
+        page, ids = self.page_ids(before=page.previous_cursor)
+        self.assertEqual(ids, first)
+        self.assertFalse(page.has_previous())
+
+    def test_signals_keep_buffer(self):
+        """Новый пост вытесняет старый id, удалённый вычёркивается."""
+        rebuild_timeline(20)
+        with run_on_commit():
+            post = Post.objects.create(text="Новый", author=self.user,
+                                       group=self.group)
+        ids = cache.get(TIMELINE_KEY)["ids"]
+        self.assertEqual(ids[0], post.pk)
+        self.assertEqual(len(ids), 20)
+
+        with run_on_commit():
+            post.group = None
+            post.save()
+            post.delete()
+        self.assertNotIn(post.pk, cache.get(TIMELINE_KEY)["ids"])
+        self.assertEqual(self.page_ids()[1], self.expected(0, 10))
+
+    def test_rebuild_under_lock(self):
+        """Пока буфер занят, страницы идут в базу, а пост, пришедший в это
+        время, попадает в буфер следующей пересборкой."""
+        rebuild_timeline()
+        cache.add(TIMELINE_LOCK_KEY, 1)
+        with run_on_commit():
+            post = Post.objects.create(text="Новый", author=self.user)
+
+        self.assertIsNone(timeline())
+        self.assertEqual(self.page_ids()[1], self.expected(0, 10))
+        with self.assertRaises(CommandError):
+            call_command("rebuild_timeline", stdout=StringIO())
+
+        cache.delete(TIMELINE_LOCK_KEY)
+        self.assertEqual(timeline()["ids"][0], post.pk)
+
+    def test_stale_buffer_rebuilt(self):
+        """Устаревший буфер и пропавшие строки ведут к пересборке."""
+        newest = rebuild_timeline()["ids"][0]
+        _delete_rows([newest])
+
+        self.assertEqual(self.page_ids()[1], self.expected(0, 10))
+        self.assertEqual(timeline()["ids"][:10], self.expected(0, 10))
+
+        Post.objects.bulk_create([Post(text="Мимо", author=self.user)])
+        forget_timeline()
+        self.assertEqual(timeline()["ids"][:10], self.expected(0, 10))
+
+    def test_index_and_rebuild_command(self):
+        """Главная страница читает буфер, команда собирает его заново."""
+        cache.clear()
+        call_command("rebuild_timeline", size=5, stdout=StringIO())
+        self.assertEqual(len(cache.get(TIMELINE_KEY)["ids"]), 5)
+
+        response = Client().get(reverse("posts:index"))
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            self.expected(0, 10))
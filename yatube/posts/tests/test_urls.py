@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 
@@ -10,6 +11,7 @@ class PostsURLTests(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
+        cache.clear()
         cls.User_mod = get_user_model()
         cls.user = cls.User_mod.objects.create_user(username="TestUser1")
         cls.user2 = cls.User_mod.objects.create_user(username="TestUser2")
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from ..models import Post
+from ..utils import CursorPaginator, decode_cursor, encode_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+
+        for i in range(25):
+            Post.objects.create(
+                text=f"Тестовый текст {i}",
+                author=cls.user,
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.pagin = CursorPaginator(Post.objects.all(), 10)
+
+    def test_cursor_roundtrip(self):
+        """Токен курсора обратимо кодирует id, мусор даёт None."""
+        self.assertEqual(decode_cursor(encode_cursor(42)), 42)
+        self.assertIsNone(decode_cursor("@@@"))
+        self.assertIsNone(decode_cursor(None))
+
+    def test_walk_forward_and_back(self):
+        """Страницы по курсорам покрывают все посты без повторов."""
+        ids = list(Post.objects.values_list("id", flat=True))
+
+        page = self.pagin.get_cursor_page()
+        seen = [post.id for post in page]
+        self.assertFalse(page.has_previous())
+        while page.has_next():
+            page = self.pagin.get_cursor_page(after=page.next_cursor)
+            seen += [post.id for post in page]
+        self.assertEqual(seen, ids)
+        self.assertEqual(len(page), 5)
+
+        page = self.pagin.get_cursor_page(before=page.previous_cursor)
+        self.assertEqual([post.id for post in page], ids[10:20])
+        self.assertTrue(page.has_next())
+
+    def test_view_uses_cursor(self):
+        """Параметр after переключает список на курсорную пагинацию."""
+        first = self.guest_client.get(reverse("posts:index"))
+        token = first.context["page_obj"].object_list[-1].id
+        response = self.guest_client.get(
+            reverse("posts:index") + f"?after={encode_cursor(token)}")
+        page_obj = response.context["page_obj"]
+
+        self.assertTrue(page_obj.is_cursor)
+        self.assertEqual(len(page_obj), 10)
+        self.assertContains(response, "?before=")
+        self.assertContains(response, "?after=")
+
+    def test_numbered_page_links_into_cursor(self):
+        """«Следующая» со страницы по номеру ведёт на курсор after."""
+        response = self.guest_client.get(
+            reverse("posts:profile", kwargs={"username": "TestUser1"}))
+        page_obj = response.context["page_obj"]
+        cursor = encode_cursor(page_obj.object_list[-1].id)
+
+        self.assertEqual(page_obj.next_cursor, cursor)
+        self.assertContains(response, f"?after={cursor}")
+
+    def test_cursor_links_keep_page_params(self):
+        """Ссылки курсорной страницы сохраняют параметры запроса."""
+        page_obj = self.pagin.get_cursor_page(
+            after=encode_cursor(Post.objects.all()[9].pk))
+        html = render_to_string("posts/includes/paginator.html", {
+            "page_obj": page_obj, "page_params": "q=x&"})
+        self.assertIn(f"?q=x&amp;before={page_obj.previous_cursor}", html)
+        self.assertIn(f"?q=x&amp;after={page_obj.next_cursor}", html)
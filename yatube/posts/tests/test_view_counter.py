@@ -0,0 +1,125 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..models import Post
+from ..view_counter import (JOURNAL_DONE_KEY, JOURNAL_SEQ_KEY,
+                            flush_views, journal_key, pending_key,
+                            pending_views, record_view)
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username="TestUser1")
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text="Тестовый текст",
+            author=self.user,
+        )
+        self.other = Post.objects.create(
+            text="Другой текст",
+            author=self.user,
+        )
+
+    def test_views_buffered_until_flush(self):
+        """Просмотры копятся в кеше и не пишут в базу до сброса."""
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                record_view(self.post.pk)
+            record_view(self.other.pk)
+
+        self.assertEqual(
+            pending_views([self.post.pk, self.other.pk]),
+            {self.post.pk: 3, self.other.pk: 1})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+        self.assertEqual(flush_views(), 2)
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.post.views, self.other.views), (3, 1))
+        self.assertEqual(pending_views([self.post.pk]), {self.post.pk: 0})
+        self.assertEqual(flush_views(), 0)
+
+    def test_views_during_flush_are_kept(self):
+        """Просмотры, пришедшие после чтения буфера, ждут следующего
+        сброса."""
+        record_view(self.post.pk)
+        flush_views()
+        record_view(self.post.pk)
+        # Эмулируем гонку: счётчик вырос, а журнал уже прочитан.
+        cache.incr(pending_key(self.post.pk))
+        flush_views()
+
+        record_view(self.post.pk)
+        flush_views()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 4)
+
+    def test_journal_slot_written_after_flush(self):
+        """Номер журнала, выданный до сброса и записанный после, не
+        теряется."""
+        # Эмулируем гонку: просмотр учтён и номер журнала выдан,
+        # а ключ журнала ещё не записан.
+        cache.set(pending_key(self.post.pk), 1, None)
+        cache.set(JOURNAL_SEQ_KEY, 1, None)
+        record_view(self.other.pk)
+        self.assertEqual(flush_views(), 1)
+        self.assertEqual(cache.get(JOURNAL_DONE_KEY), 0)
+
+        cache.set(journal_key(1), self.post.pk, None)
+        self.assertEqual(flush_views(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 1)
+
+    def test_lost_journal_slot_skipped(self):
+        """Пропуск, не заполненный и ко второму сбросу, пропускается."""
+        cache.add(JOURNAL_SEQ_KEY, 1, None)
+        record_view(self.post.pk)
+        flush_views()
+        self.assertEqual(cache.get(JOURNAL_DONE_KEY), 0)
+
+        flush_views()
+        self.assertEqual(cache.get(JOURNAL_DONE_KEY), 2)
+        record_view(self.post.pk)
+        self.assertEqual(flush_views(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_detail_shows_merged_count(self):
+        """Страница поста складывает сохранённое значение и буфер."""
+        Post.objects.filter(pk=self.post.pk).update(views=10)
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+
+        self.guest_client.get(url)
+        response = self.guest_client.get(url)
+
+        self.assertEqual(response.context["views"], 12)
+        self.assertEqual(
+            self.guest_client.get(url).context["views"], 13)
+
+    def test_missing_post_not_counted(self):
+        """Просмотр несуществующего поста не попадает в буфер."""
+        response = self.guest_client.get(
+            reverse("posts:post_detail", kwargs={"post_id": 1000000000}))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(pending_views([1000000000]), {1000000000: 0})
+        self.assertIsNone(cache.get(JOURNAL_SEQ_KEY))
+
+    def test_flush_command(self):
+        """Команда сбрасывает буфер в базу."""
+        record_view(self.post.pk)
+        call_command("flush_post_views", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 1)
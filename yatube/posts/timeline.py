@@ -0,0 +1,185 @@
+"""Общая лента главной страницы: кольцевой буфер последних id постов.
+
+В общем кеше одним ключом лежат POSTS_TIMELINE_SIZE самых новых id
+по убыванию. Первые страницы index читаются одним запросом id IN (...)
+без ORDER BY ... LIMIT/OFFSET по таблице постов; страницы за окном
+буфера, как и раньше, идут в базу.
+
+Сигналы Post дописывают и вычёркивают id под блокировкой в кеше. Если
+блокировку взять не удалось, буфер помечается устаревшим и пересобирается
+первым чтением, как и после массовых операций в обход сигналов (импорт,
+удаление автора). Пересборка идёт под той же блокировкой: пост, пришедший
+во время неё, снова помечает буфер устаревшим, а не теряется под
+перезаписью. Пока блокировка занята, страницы читаются из базы.
+Пропавшая из базы строка при чтении тоже сбрасывает буфер. Смена группы
+поста порядок общей ленты не меняет: строки страницы всегда читаются
+из базы, поэтому буфер её не хранит.
+"""
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from .constants import POSTS_TIMELINE_SIZE
+from .models import Post
+from .utils import (CountedPaginator, CursorPage, CursorPaginator,
+                    CURSOR_AFTER, CURSOR_BEFORE, decode_cursor,
+                    with_next_cursor)
+
+
+TIMELINE_KEY = "posts:timeline"
+TIMELINE_STALE_KEY = f"{TIMELINE_KEY}:stale"
+TIMELINE_LOCK_KEY = f"{TIMELINE_KEY}:lock"
+TIMELINE_LOCK_TIMEOUT = 10
+# Буфер без id: все страницы идут в базу.
+EMPTY_TIMELINE = {"ids": [], "size": 0, "complete": False}
+
+
+def rebuild_timeline(size=POSTS_TIMELINE_SIZE):
+    """Собирает буфер заново одним запросом по индексу первичного ключа.
+
+    size - ёмкость буфера, complete - в буфере все посты и за его окном
+    базу читать не нужно. None - буфер сейчас меняет другой процесс.
+    """
+    if not cache.add(TIMELINE_LOCK_KEY, 1, TIMELINE_LOCK_TIMEOUT):
+        return None
+    try:
+        cache.delete(TIMELINE_STALE_KEY)
+        ids = list(Post.objects.order_by("-id")
+                   .values_list("id", flat=True)[:size + 1])
+        timeline = {"ids": ids[:size], "size": size,
+                    "complete": len(ids) <= size}
+        cache.set(TIMELINE_KEY, timeline, None)
+        return timeline
+    finally:
+        cache.delete(TIMELINE_LOCK_KEY)
+
+
+def timeline():
+    """Текущий буфер; отсутствующий или устаревший собирается заново.
+
+    None - буфер пересобирает другой процесс.
+    """
+    values = cache.get_many([TIMELINE_KEY, TIMELINE_STALE_KEY])
+    if TIMELINE_KEY in values and TIMELINE_STALE_KEY not in values:
+        return values[TIMELINE_KEY]
+    return rebuild_timeline()
+
+
+def forget_timeline():
+    """Помечает буфер устаревшим: следующее чтение соберёт его заново."""
+    cache.set(TIMELINE_STALE_KEY, 1, None)
+
+
+def _update(change):
+    if not cache.add(TIMELINE_LOCK_KEY, 1, TIMELINE_LOCK_TIMEOUT):
+        forget_timeline()
+        return
+    try:
+        current = cache.get(TIMELINE_KEY)
+        # Без буфера менять нечего: первое чтение соберёт его заново.
+        if current is not None:
+            cache.set(TIMELINE_KEY, change(current), None)
+    finally:
+        cache.delete(TIMELINE_LOCK_KEY)
+
+
+def push_post(post_id):
+    """Добавляет новый пост, вытесняя самый старый id из полного буфера."""
+    def change(current):
+        size = current["size"]
+        ids = sorted({post_id, *current["ids"]}, reverse=True)
+        return {**current, "ids": ids[:size],
+                "complete": current["complete"] and len(ids) <= size}
+
+    _update(change)
+
+
+def drop_post(post_id):
+    """Вычёркивает удалённый пост; окно буфера сужается до пересборки."""
+    def change(current):
+        return {**current,
+                "ids": [pk for pk in current["ids"] if pk != post_id]}
+
+    _update(change)
+
+
+def _rows(posts, ids):
+    """Строки постов ids в их порядке или None, если какой-то пропал."""
+    rows = posts.in_bulk(ids)
+    if len(rows) < len(ids):
+        forget_timeline()
+        return None
+    return [rows[pk] for pk in ids]
+
+
+def _position(ids, pk):
+    """Индекс первого id меньше pk в убывающем списке ids."""
+    return len(ids) - bisect_left(ids[::-1], pk)
+
+
+class TimelinePaginator(CountedPaginator):
+    """Страницы по номеру из буфера, за его окном - как обычно."""
+
+    def __init__(self, object_list, per_page, count_provider, timeline,
+                 **kwargs):
+        super().__init__(object_list, per_page, count_provider, **kwargs)
+        self.timeline = timeline
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        ids = self.timeline["ids"]
+        if top <= len(ids) or self.timeline["complete"]:
+            rows = _rows(self.object_list, ids[bottom:top])
+            if rows is not None:
+                return self._get_page(rows, number, self)
+        return super().page(number)
+
+
+def _cursor_page(posts, page_lim, current, after, before):
+    ids = current["ids"]
+    after_pk = decode_cursor(after)
+    before_pk = decode_cursor(before)
+
+    if before_pk is not None:
+        # Все посты новее before лежат в буфере, если курсор в его окне.
+        if not ids or (before_pk < ids[-1] and not current["complete"]):
+            return None
+        end = _position(ids, before_pk + 1)
+        start = max(0, end - page_lim)
+        rows = _rows(posts, ids[start:end])
+        if rows is None:
+            return None
+        return CursorPage(rows, CursorPaginator(posts, page_lim), True,
+                          start > 0)
+
+    start = 0 if after_pk is None else _position(ids, after_pk)
+    window = ids[start:start + page_lim + 1]
+    if len(window) <= page_lim and not current["complete"]:
+        return None
+    rows = _rows(posts, window[:page_lim])
+    if rows is None:
+        return None
+    return CursorPage(rows, CursorPaginator(posts, page_lim),
+                      len(window) > page_lim, after_pk is not None)
+
+
+def timeline_page(posts, page_lim, request, count):
+    """Как utils.paginator для всей ленты, но первые страницы из буфера.
+
+    posts - Post.objects.for_list() без фильтров.
+    """
+    current = timeline() or EMPTY_TIMELINE
+    after = request.GET.get(CURSOR_AFTER)
+    before = request.GET.get(CURSOR_BEFORE)
+
+    if after is not None or before is not None:
+        page = _cursor_page(posts, page_lim, current, after, before)
+        if page is not None:
+            return page
+        return CursorPaginator(posts, page_lim).get_cursor_page(
+            after=after, before=before)
+
+    pagin = TimelinePaginator(posts, page_lim, count, current)
+    return with_next_cursor(pagin.get_page(request.GET.get("page")))
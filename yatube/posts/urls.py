@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 
 app_name = "posts"
@@ -8,8 +8,22 @@ app_name = "posts"
 urlpatterns = [
     path("", views.index, name="index"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path("group/<slug:slug>/subscribe/", views.group_subscribe,
+         name="group_subscribe"),
+    path("group/<slug:slug>/unsubscribe/", views.group_unsubscribe,
+         name="group_unsubscribe"),
+    path("feed/", views.feed, name="feed"),
     path("profile/<str:username>/", views.profile, name="profile"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path("create/", views.post_create, name="post_create"),
+    path("search/", views.search, name="search"),
+    path("export/posts.ndjson.gz", views.export_posts, name="export_posts"),
+    path("api/posts/", api.index_feed, name="api_index"),
+    path("api/group/<slug:slug>/posts/", api.group_feed,
+         name="api_group_list"),
+    path("api/profile/<str:username>/posts/", api.profile_feed,
+         name="api_profile"),
+    path("api/posts/<int:post_id>/", api.post_detail,
+         name="api_post_detail"),
 ]
@@ -1,9 +1,142 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
 
+from django.core.paginator import Page, Paginator
+from django.utils.functional import cached_property
 
-def paginator(posts, page_lim, request):
-    pagin = Paginator(posts, page_lim)
-    page_number = request.GET.get("page")
 
-    return pagin.get_page(page_number)
+CURSOR_AFTER = "after"
+CURSOR_BEFORE = "before"
 
+
+def encode_cursor(pk):
+    """Упаковывает id поста в непрозрачный токен курсора."""
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора, для мусора возвращает None."""
+    if not token:
+        return None
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CursorPage(Page):
+    """Страница курсорной пагинации, совместимая с Page.
+
+    Номер страницы и общее число страниц неизвестны, поэтому вместо
+    номеров наружу отдаются токены соседних страниц.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.is_cursor = True
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1].pk)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0].pk)
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+class CursorPaginator(Paginator):
+    """Пагинация по ключу Post.id без COUNT(*) и OFFSET.
+
+    Ожидает queryset, упорядоченный по "-id" (Post.Meta.ordering),
+    поэтому любая страница стоит столько же, сколько первая.
+    """
+
+    def get_cursor_page(self, after=None, before=None):
+        after_pk = decode_cursor(after)
+        before_pk = decode_cursor(before)
+        limit = self.per_page + 1
+
+        if before_pk is not None:
+            rows = list(
+                self.object_list.filter(pk__gt=before_pk)
+                .order_by("id")[:limit])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+
+            return CursorPage(rows, self, True, has_previous)
+
+        posts = self.object_list
+        if after_pk is not None:
+            posts = posts.filter(pk__lt=after_pk)
+        rows = list(posts.order_by("-id")[:limit])
+        has_next = len(rows) > self.per_page
+
+        return CursorPage(
+            rows[:self.per_page], self, has_next, after_pk is not None)
+
+
+class CountedPaginator(Paginator):
+    """Paginator, берущий число объектов у внешнего провайдера."""
+
+    def __init__(self, object_list, per_page, count_provider, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_provider = count_provider
+
+    @cached_property
+    def count(self):
+        return self.count_provider()
+
+
+def with_next_cursor(page):
+    """Курсор для ссылки «Следующая» со страницы по номеру: дальше
+    лента листается по ключу, без растущего OFFSET."""
+    if page.has_next():
+        page.next_cursor = encode_cursor(page[-1].pk)
+    return page
+
+
+def paginator(posts, page_lim, request, count=None, keyset=True):
+    """Страница по номеру или, при after/before, по курсору.
+
+    keyset=False - только номера страниц: для выборок не по "-id".
+    """
+    after = request.GET.get(CURSOR_AFTER)
+    before = request.GET.get(CURSOR_BEFORE)
+
+    if keyset and (after is not None or before is not None):
+        pagin = CursorPaginator(posts, page_lim)
+
+        return pagin.get_cursor_page(after=after, before=before)
+
+    if count is not None:
+        pagin = CountedPaginator(posts, page_lim, count)
+    else:
+        pagin = Paginator(posts, page_lim)
+    page = pagin.get_page(request.GET.get("page"))
+
+    return with_next_cursor(page) if keyset else page
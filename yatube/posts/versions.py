@@ -0,0 +1,52 @@
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+VERSION_KEY_PREFIX = "posts:version"
+
+
+def version_key(scope):
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def new_token():
+    """Токен версии: время изменения и случайный хвост."""
+    return f"{time.time():.6f}-{uuid4().hex[:8]}"
+
+
+def token_time(token):
+    return float(str(token).split("-", 1)[0])
+
+
+def scope_tokens(*scopes):
+    """Текущие токены областей; пропавший токен заводится заново.
+
+    Токен случайный, поэтому вытесненный из кеша ключ не может вернуть
+    к жизни записи, сброшенные раньше, а его время лишь сдвигается
+    вперёд.
+    """
+    keys = [version_key(scope) for scope in scopes]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, new_token(), None)
+            tokens[key] = cache.get(key)
+    return [tokens[key] for key in keys]
+
+
+def scope_versions(*scopes):
+    return ":".join(str(token) for token in scope_tokens(*scopes))
+
+
+def last_changed(*scopes):
+    """Время последнего изменения любой из областей (unix time)."""
+    return max(token_time(token) for token in scope_tokens(*scopes))
+
+
+def bump_versions(*scopes):
+    """Отмечает изменение областей, осиротив все ключи со старыми версиями."""
+    token = new_token()
+    cache.set_many(
+        {version_key(scope): token for scope in scopes if scope}, None)
@@ -0,0 +1,157 @@
+"""Счётчик просмотров постов с отложенной записью в базу.
+
+Просмотр — это cache.incr по ключу поста, без записи в SQLite. Буфер
+сбрасывается в Post.views пачкой UPDATE не чаще раза в
+POSTS_VIEWS_FLUSH_INTERVAL секунд: попутно из запроса или командой
+flush_post_views (cron, остановка сервиса).
+
+Список id на сброс ведётся журналом: каждый пост попадает в него,
+когда его счётчик растёт с нуля, ключи журнала нумерует cache.incr.
+Буфер уменьшается на сброшенное значение только после коммита UPDATE,
+так что просмотры, пришедшие во время сброса, остаются в кеше.
+
+Номер ключа журнала выдаётся раньше, чем ключ записан, поэтому сброс
+продвигает отметку прочитанного только до первого пропуска. Пропуск,
+который не заполнился и к следующему сбросу (процесс упал между incr
+и set), пропускается.
+
+Потери ограничены содержимым буфера: при падении процесса с LocMemCache
+теряются просмотры этого процесса за последний интервал, с общим кешем
+(memcached, redis) — только при его перезапуске или вытеснении ключей.
+Падение между коммитом и уменьшением буфера даёт двойной учёт одной
+пачки при следующем сбросе.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .constants import POSTS_VIEWS_FLUSH_BATCH, POSTS_VIEWS_FLUSH_INTERVAL
+from .models import Post
+
+
+VIEWS_KEY_PREFIX = "posts:views"
+JOURNAL_SEQ_KEY = f"{VIEWS_KEY_PREFIX}:seq"
+JOURNAL_DONE_KEY = f"{VIEWS_KEY_PREFIX}:flushed"
+JOURNAL_GAP_KEY = f"{VIEWS_KEY_PREFIX}:gap"
+NEXT_FLUSH_KEY = f"{VIEWS_KEY_PREFIX}:next_flush"
+FLUSH_LOCK_KEY = f"{VIEWS_KEY_PREFIX}:lock"
+FLUSH_LOCK_TIMEOUT = 60
+
+
+def pending_key(post_id):
+    return f"{VIEWS_KEY_PREFIX}:pending:{post_id}"
+
+
+def journal_key(seq):
+    return f"{VIEWS_KEY_PREFIX}:journal:{seq}"
+
+
+def _incr(key, delta=1):
+    cache.add(key, 0, None)
+    return cache.incr(key, delta)
+
+
+def _enqueue(post_id):
+    cache.set(journal_key(_incr(JOURNAL_SEQ_KEY)), post_id, None)
+
+
+def record_view(post_id):
+    """Учитывает просмотр в буфере, без запросов к базе."""
+    if _incr(pending_key(post_id)) == 1:
+        _enqueue(post_id)
+
+
+def pending_views(post_ids):
+    """Ещё не сброшенные просмотры: {id: delta}."""
+    values = cache.get_many([pending_key(post_id) for post_id in post_ids])
+    return {post_id: values.get(pending_key(post_id), 0)
+            for post_id in post_ids}
+
+
+def total_views(post):
+    """Сохранённые просмотры плюс буфер."""
+    return post.views + pending_views([post.pk])[post.pk]
+
+
+def _journal_batches(start, stop):
+    for first in range(start, stop + 1, POSTS_VIEWS_FLUSH_BATCH):
+        last = min(first + POSTS_VIEWS_FLUSH_BATCH, stop + 1)
+        yield first, [journal_key(seq) for seq in range(first, last)]
+
+
+def _read_journal(start, stop, skip=None):
+    """id из журнала start..stop и последний номер, до которого журнал
+    прочитан без пропусков; номер skip пропуском не считается."""
+    ids = set()
+    done = stop
+    for first, keys in _journal_batches(start, stop):
+        found = cache.get_many(keys)
+        ids.update(found.values())
+        missing = [seq for seq, key in enumerate(keys, first)
+                   if key not in found and seq != skip]
+        if missing and done == stop:
+            done = missing[0] - 1
+    return ids, done
+
+
+def _write_views(pending):
+    """Добавляет просмотры к Post.views: одинаковые приращения - один
+    UPDATE ... WHERE id IN (...)."""
+    by_delta = {}
+    for post_id, delta in pending.items():
+        by_delta.setdefault(delta, []).append(post_id)
+    with transaction.atomic():
+        for delta, post_ids in by_delta.items():
+            for first in range(0, len(post_ids), POSTS_VIEWS_FLUSH_BATCH):
+                Post.objects.filter(
+                    pk__in=post_ids[first:first + POSTS_VIEWS_FLUSH_BATCH]
+                ).update(views=F("views") + delta)
+
+
+def _release_views(pending):
+    """Уменьшает буфер на записанное; просмотры, пришедшие во время
+    сброса, ждут следующего."""
+    for post_id, delta in pending.items():
+        try:
+            left = cache.decr(pending_key(post_id), delta)
+        except ValueError:
+            continue
+        if left > 0:
+            _enqueue(post_id)
+
+
+def flush_views():
+    """Переносит буфер в Post.views; возвращает число обновлённых постов.
+
+    Параллельные сбросы исключены блокировкой в кеше: второй сразу
+    возвращает 0.
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        done = cache.get(JOURNAL_DONE_KEY, 0)
+        seq = cache.get(JOURNAL_SEQ_KEY, 0)
+        if seq <= done:
+            return 0
+        ids, ready = _read_journal(done + 1, seq,
+                                   cache.get(JOURNAL_GAP_KEY))
+        pending = {post_id: delta for post_id, delta
+                   in pending_views(ids).items() if delta > 0}
+
+        _write_views(pending)
+        if ready < seq:
+            cache.set(JOURNAL_GAP_KEY, ready + 1, None)
+        cache.set(JOURNAL_DONE_KEY, ready, None)
+        for _, keys in _journal_batches(done + 1, ready):
+            cache.delete_many(keys)
+        _release_views(pending)
+        return len(pending)
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def maybe_flush_views():
+    """Сброс из запроса, не чаще раза в POSTS_VIEWS_FLUSH_INTERVAL."""
+    if cache.add(NEXT_FLUSH_KEY, 1, POSTS_VIEWS_FLUSH_INTERVAL):
+        return flush_views()
+    return 0
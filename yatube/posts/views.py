@@ -1,18 +1,40 @@
+from functools import partial
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-
-from .models import Post, Group, User
-from .constants import POSTS_GROUP_POSTS_PAGE_LIM, POSTS_INDEX_PAGE_LIM
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.db import transaction
+from django.views.decorators.http import require_POST
+
+from .models import GroupSubscription, Post
+from .constants import (POSTS_FEED_PAGE_LIM, POSTS_GROUP_POSTS_PAGE_LIM,
+                        POSTS_INDEX_PAGE_LIM, POSTS_SEARCH_PAGE_LIM)
+from .conditional import (conditional_page, group_exists, group_scopes,
+                          group_viewer_scopes, index_scopes, profile_exists,
+                          profile_scopes)
+from .counts import post_count
+from .export import export_stream
+from .feed import feed_page, invalidate_subscriptions, subscribed_group_ids
 from .forms import PostForm
-from .utils import paginator
+from .lookups import authors, groups
+from .page_cache import (cache_anonymous_page, group_page_scope,
+                         profile_page_scope)
+from .search import SearchResults
+from .timeline import timeline_page
+from .utils import CURSOR_AFTER, CURSOR_BEFORE, paginator
+from .view_counter import maybe_flush_views, record_view, total_views
 
 
+@conditional_page(index_scopes)
+@cache_anonymous_page("index")
 def index(request):
     template = "posts/index.html"
-    posts = Post.objects.select_related(
-        "group")
+    posts = Post.objects.for_list()
 
-    page_obj = paginator(posts, POSTS_INDEX_PAGE_LIM, request)
+    page_obj = timeline_page(posts, POSTS_INDEX_PAGE_LIM, request,
+                             count=post_count)
 
     context = {
         "page_obj": page_obj,
@@ -21,41 +43,114 @@ def index(request):
     return render(request, template, context)
 
 
+@conditional_page(group_scopes, group_exists, group_viewer_scopes)
+@cache_anonymous_page("group", group_page_scope)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.select_related(
-        "author").filter(group=group)
+    group = groups.get_or_404(slug)
+    posts = Post.objects.for_list().filter(group=group)
 
-    page_obj = paginator(posts, POSTS_GROUP_POSTS_PAGE_LIM, request)
+    page_obj = paginator(posts, POSTS_GROUP_POSTS_PAGE_LIM, request,
+                         count=partial(post_count, group=group))
 
     context = {
         "group": group,
         "page_obj": page_obj,
+        "is_subscribed": (
+            request.user.is_authenticated
+            and GroupSubscription.objects.filter(
+                user=request.user, group=group).exists()),
     }
 
     return render(request, "posts/group_list.html", context)
 
 
+@require_POST
+@login_required
+def group_subscribe(request, slug):
+    group = groups.get_or_404(slug)
+    GroupSubscription.objects.get_or_create(user=request.user, group=group)
+    # Кнопка подписки - личная часть страницы группы: меняется ETag
+    # только этого пользователя.
+    invalidate_subscriptions(request.user.pk)
+
+    return redirect("posts:group_list", slug=slug)
+
+
+@require_POST
+@login_required
+def group_unsubscribe(request, slug):
+    group = groups.get_or_404(slug)
+    GroupSubscription.objects.filter(user=request.user, group=group).delete()
+    invalidate_subscriptions(request.user.pk)
+
+    return redirect("posts:group_list", slug=slug)
+
+
+@login_required
+def feed(request):
+    group_ids = subscribed_group_ids(request.user)
+
+    page_obj = feed_page(group_ids, POSTS_FEED_PAGE_LIM,
+                         after=request.GET.get(CURSOR_AFTER),
+                         before=request.GET.get(CURSOR_BEFORE))
+
+    context = {
+        "page_obj": page_obj,
+        "has_subscriptions": bool(group_ids),
+    }
+
+    return render(request, "posts/feed.html", context)
+
+
+@conditional_page(profile_scopes, profile_exists)
+@cache_anonymous_page("profile", profile_page_scope)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = Post.objects.select_related(
-        "group").filter(author=user)
+    user = authors.get_or_404(username)
+    posts = Post.objects.for_list().filter(author=user)
+    posts_count = post_count(author=user)
 
-    page_obj = paginator(posts, POSTS_INDEX_PAGE_LIM, request)
+    page_obj = paginator(posts, POSTS_INDEX_PAGE_LIM, request,
+                         count=lambda: posts_count)
 
     context = {
         "author": user,
+        "posts_count": posts_count,
         "page_obj": page_obj,
     }
 
     return render(request, "posts/profile.html", context)
 
 
+def search(request):
+    query = request.GET.get("q", "").strip()
+
+    # Результаты упорядочены по рангу, курсор по id к ним не применим.
+    page_obj = paginator(SearchResults(query), POSTS_SEARCH_PAGE_LIM, request,
+                         keyset=False)
+
+    context = {
+        "query": query,
+        "page_obj": page_obj,
+        "page_params": urlencode({"q": query}) + "&",
+    }
+
+    return render(request, "posts/search.html", context)
+
+
 def post_detail(request, post_id):
-    post_det = get_object_or_404(Post, pk=post_id)
+    post_det = get_object_or_404(
+        Post.objects.select_related("author__post_stats", "group"),
+        pk=post_id)
+    # Только для существующих постов: иначе буфер растёт от любых id.
+    # Условного GET у страницы нет - счётчик меняется с каждым
+    # просмотром, и 304 показывал бы устаревшее число.
+    if request.method == "GET":
+        maybe_flush_views()
+        record_view(post_det.pk)
 
     context = {
         "post_det": post_det,
+        "views": total_views(post_det),
     }
 
     return render(request, "posts/post_detail.html", context)
@@ -69,7 +164,8 @@ def post_create(request):
     if form.is_valid():
         new_post = form.save(commit=False)
         new_post.author = request.user
-        new_post.save()
+        with transaction.atomic():
+            new_post.save()
 
         return redirect("posts:profile", username=request.user.username)
 
@@ -93,7 +189,8 @@ def post_edit(request, post_id):
 
     if form.is_valid():
         form.author = request.user
-        form.save()
+        with transaction.atomic():
+            form.save()
 
         return redirect("posts:post_detail", post_id=post_id)
 
@@ -104,3 +201,22 @@ def post_edit(request, post_id):
     }
 
     return render(request, "posts/create_post.html", context)
+
+
+@staff_member_required
+def export_posts(request):
+    filters = {
+        "date_from": request.GET.get("from"),
+        "date_to": request.GET.get("to"),
+        "group": request.GET.get("group"),
+        "author": request.GET.get("author"),
+    }
+    try:
+        stream = export_stream(**filters)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    response = StreamingHttpResponse(stream, content_type="application/gzip")
+    response["Content-Disposition"] = 'attachment; filename="posts.ndjson.gz"'
+
+    return response
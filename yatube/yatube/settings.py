@@ -36,10 +36,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.query_stats.QueryStatsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+# сколько одинаковых запросов из рендера шаблона считать N+1
+QUERY_STATS_N_PLUS_ONE_THRESHOLD = 3
+# место в шаблоне для каждого запроса, а не только для повторов от порога
+# N+1; без DEBUG выключено: обход стека на каждом SQL-запросе дорог
+QUERY_STATS_ORIGINS = False
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 IMG_DIR = os.path.join(BASE_DIR, 'img')
@@ -70,11 +77,66 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # sqlite3 с WAL и прагмами, см. core/backends/sqlite3/base.py
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    'cache': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.CacheRouter']
+
+# Двухуровневый кеш, см. core/cache.py: LRU процесса перед общим кешем.
+# Общий уровень - таблица в отдельной базе cache.sqlite3 с атомарными
+# add/incr; создаётся после migrate, см. core/apps.py.
+# На нескольких машинах 'shared' переводится на memcached или redis.
+TWO_TIER_CACHE = {
+    'BACKEND': 'core.cache.TwoTierCache',
+    'LOCATION': 'yatube',
+    'OPTIONS': {
+        'SHARED': 'shared',
+        # версии уже в ключах страниц и фрагментов, см. posts/versions.py
+        'LOCAL_KEY_PREFIXES': ['posts:page', 'template.cache.'],
+        'LOCAL_MAX_ENTRIES': 1000,
+        'LOCAL_TIMEOUT': 5,
+        'LOCK_TIMEOUT': 10,
+        'LOCK_WAIT': 2,
+        'BETA': 1.0,
+    },
 }
 
+CACHES = {
+    'default': TWO_TIER_CACHE,
+    'shared': {
+        'BACKEND': 'core.cache.SharedDatabaseCache',
+        'LOCATION': 'yatube_cache',
+        # ключи без явного срока (буфер просмотров, токены версий)
+        # не истекают.
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Тесты (core/test_runner.py, tests/fixtures/fixture_cache.py) не трогают
+# общий кеш проекта.
+TEST_CACHES = {
+    'default': TWO_TIER_CACHE,
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube-tests',
+        'TIMEOUT': None,
+    },
+}
+
+TEST_RUNNER = 'core.test_runner.LocMemCacheTestRunner'
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {